@@ -1,26 +1,136 @@
+import logging
+
 from mesa import Agent, Model
 from mesa.space import ContinuousSpace
 from mesa.time import RandomActivation
+import numpy as np
+
+# Debug events, off unless enabled (see eventlog.py)
+log = logging.getLogger("flocking")
+
+class SpatialHash:
+    """Uniform grid of buckets at least radius wide over a ContinuousSpace.
+
+    build() sorts the positions on their bucket once per step. neighbor_pairs()
+    then finds every pair within radius at once by checking only the 3x3
+    buckets around each point, so the cost grows with N rather than N^2.
+    """
+    def __init__(self, width, height, radius, torus=True):
+        self.width = width
+        self.height = height
+        self.radius = radius
+        self.torus = torus
+        self.nx = max(1, int(width // radius))
+        self.ny = max(1, int(height // radius))
+        # Neighbouring buckets; on a small torus some of them are the same
+        if torus:
+            offsets_x = sorted({d % self.nx for d in (-1, 0, 1)})
+            offsets_y = sorted({d % self.ny for d in (-1, 0, 1)})
+        else:
+            offsets_x = offsets_y = [-1, 0, 1]
+        self.offsets = [(dx, dy) for dx in offsets_x for dy in offsets_y]
+
+    def build(self, positions):
+        self.positions = positions
+        self.bx = np.minimum((positions[:, 0] * self.nx / self.width).astype(np.int64), self.nx - 1)
+        self.by = np.minimum((positions[:, 1] * self.ny / self.height).astype(np.int64), self.ny - 1)
+        bucket = self.bx * self.ny + self.by
+        self.order = np.argsort(bucket, kind="stable")
+        self.bucket_count = np.bincount(bucket, minlength=self.nx * self.ny)
+        self.bucket_first = np.cumsum(self.bucket_count) - self.bucket_count
+
+    def neighbor_pairs(self, include_center=False):
+        """All pairs (i, j) with j within radius of i, sorted on i."""
+        points = np.arange(len(self.positions))
+        pairs_i = []
+        pairs_j = []
+        for dx, dy in self.offsets:
+            bx = self.bx + dx
+            by = self.by + dy
+            if self.torus:
+                bx %= self.nx
+                by %= self.ny
+                inside = points
+            else:
+                inside = points[(bx >= 0) & (bx < self.nx) & (by >= 0) & (by < self.ny)]
+            bucket = bx[inside] * self.ny + by[inside]
+            count = self.bucket_count[bucket]
+            first = self.bucket_first[bucket]
+            # Expand every point into one candidate per point in the bucket
+            i = np.repeat(inside, count)
+            start = np.repeat(first - (np.cumsum(count) - count), count)
+            j = self.order[start + np.arange(len(i))]
+            pairs_i.append(i)
+            pairs_j.append(j)
+        i = np.concatenate(pairs_i)
+        j = np.concatenate(pairs_j)
+
+        distance = np.hypot(*self.offset(i, j).T)
+        keep = distance <= self.radius
+        if not include_center:
+            # As in ContinuousSpace.get_neighbors: nothing at distance 0
+            keep &= distance > 0
+        i = i[keep]
+        j = j[keep]
+        order = np.argsort(i, kind="stable")
+        return i[order], j[order]
+
+    def offset(self, i, j):
+        """Shortest vector from point i to point j."""
+        delta = self.positions[j] - self.positions[i]
+        if self.torus:
+            size = np.array([self.width, self.height])
+            delta = (delta + size / 2) % size - size / 2
+        return delta
+
 
 class FlockingAgent(Agent):
+    """A bird; its position and velocity live in the model's arrays."""
     def __init__(self, unique_id, model):
         super().__init__(unique_id, model)
-        
-    def flock(self):
-        neighbors = self.model.space.get_neighbors(self.pos, 4, False)
-        if not neighbors:
-            print("I have no neighbors")
-        else:
-            print("I have neighbors")
-            
+
+    @property
+    def velocity(self):
+        return self.model.velocities[self.unique_id]
+
+    @property
+    def heading_x(self):
+        return float(self.velocity[0])
+
+    @property
+    def heading_y(self):
+        return float(self.velocity[1])
+
     def step(self):
-        self.flock()
-        
+        # Keep the ContinuousSpace in sync with the batched update
+        self.model.space.move_agent(self, tuple(self.model.positions[self.unique_id].tolist()))
+
 class FlockingModel(Model):
-    def __init__(self, N, width, height):
+    """Boids on a toroidal ContinuousSpace.
+
+    Positions and velocities of all birds are (N, 2) arrays. Every step each
+    bird steers towards the mean position of the birds within vision
+    (cohesion), towards their mean velocity (alignment) and away from birds
+    closer than separation (separation), as in the Mesa boid_flockers
+    example. The new velocities are normalised and all birds move speed
+    along them at once.
+    """
+    def __init__(self, N, width, height, vision=4, speed=1, separation=2,
+                 cohere=0.03, separate=0.015, match=0.05):
         self.num_agents = N
+        self.vision = vision
+        self.speed = speed
+        self.separation = separation
+        self.cohere = cohere
+        self.separate = separate
+        self.match = match
+        self.size = np.array([width, height], dtype=float)
         self.space = ContinuousSpace(width, height, True, 0, 0)
         self.schedule = RandomActivation(self)
+        self.neighbor_index = SpatialHash(width, height, vision, torus=True)
+        self.birds = []
+        self.positions = np.zeros((N, 2))
+        self.velocities = np.zeros((N, 2))
         
         ##Create & place agents
         for i in range(self.num_agents):
@@ -30,8 +140,54 @@ class FlockingModel(Model):
             y = self.random.randrange(self.space.height)
             pos = x, y
             self.space.place_agent(bird, pos) 
-            
+            self.birds.append(bird)
+            self.positions[i] = pos
+            angle = self.random.uniform(0, 2 * np.pi)
+            self.velocities[i] = np.cos(angle), np.sin(angle)
+        self.update_neighbors()
+
+    def update_neighbors(self):
+        # One rebuild and one batched query per step instead of one scan per bird
+        self.neighbor_index.build(self.positions)
+        self.neighbor_pairs = self.neighbor_index.neighbor_pairs()
+        self.neighbor_first = np.searchsorted(self.neighbor_pairs[0], np.arange(self.num_agents + 1))
+
+    def get_neighbors(self, bird):
+        first = self.neighbor_first[bird.unique_id]
+        last = self.neighbor_first[bird.unique_id + 1]
+        return [self.birds[j] for j in self.neighbor_pairs[1][first:last]]
+
+    def flock(self):
+        i, j = self.neighbor_pairs
+        n = self.num_agents
+        offset = self.neighbor_index.offset(i, j)
+        neighbors = np.diff(self.neighbor_first)
+        if log.isEnabledFor(logging.DEBUG):
+            for bird, count in enumerate(neighbors.tolist()):
+                log.debug("flock", extra={"data": {"step": self.schedule.steps, "agent": bird,
+                                                   "neighbors": count}})
+        count = np.maximum(neighbors, 1)[:, None]
+
+        def total(weights, rows=i):
+            return np.column_stack([np.bincount(rows, weights=weights[:, k], minlength=n) for k in range(2)])
+
+        cohesion = total(offset) / count
+        alignment = total(self.velocities[j]) / count
+        close = np.hypot(offset[:, 0], offset[:, 1]) < self.separation
+        separation = -total(offset[close], i[close])
+
+        self.velocities += (cohesion * self.cohere + separation * self.separate
+                            + alignment * self.match) / 2
+        norm = np.hypot(self.velocities[:, 0], self.velocities[:, 1])[:, None]
+        self.velocities /= np.where(norm > 0, norm, 1)
+        self.positions += self.velocities * self.speed
+        self.positions %= self.size
+        # Float rounding can land exactly on the far edge
+        self.positions[self.positions >= self.size] = 0
+
     def step(self):
+        self.update_neighbors()
+        self.flock()
         self.schedule.step()
 
         
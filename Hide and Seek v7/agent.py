@@ -1,98 +1,12 @@
 from mesa import Agent
-import random
 import math
 
-direction_list = [(-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0)]
-
-
-def find_path(self):
-    # Patch agent vinden voor start en einde, functie van Mesa geeft lijst met
-    # alle agents, dus ook evt. Hider en Seeker
-    end_node = [agent for agent in self.model.grid.get_cell_list_contents([self.end_nodes_pos[self.end_node_count]])
-                if isinstance(agent, Patch)][0]
-    start_node = [agent for agent in self.model.grid.get_cell_list_contents([self.start])
-                  if isinstance(agent, Patch)][0]
-
-    # Open en closed lijsten maken, start- en eindnode waardes aanmaken, start_node parent op None
-    # omdat deze nog opgeslagen is na een eerste zoekronde
-    open_list = []
-    closed_list = []
-    start_node.parent = None
-
-    start_node.g = start_node.h = start_node.f = 0
-    end_node.g = end_node.h = end_node.f = 0
-
-    open_list.append(start_node)
-
-    # Als de open lijst op 0 staat is er geen weg naar de eindnode
-    while len(open_list) > 0:
-        current_node = open_list[0]
-        current_index = 0
-
-        # Kijken wat de beste node is o.b.v. f-waarde
-        for index, item in enumerate(open_list):
-            if item.f < current_node.f:
-                current_node = item
-                current_index = index
-
-        # Current node uit open lijst halen en in closed lijst
-        open_list.pop(current_index)
-
-        closed_list.append(current_node)
-
-        # Checken of eindbestemming bereikt is en met terugwerkende kracht
-        # route vinden
-        if current_node == end_node:
-            path = []
-            current = current_node
-
-            while current.parent is not None:
-                path.append(current.pos)
-                current = current.parent
-
-            return path[::-1]
-
-        # Children aanmaken voor current node om zo potentiële nieuwe nodes
-        # te vinden
-        children = []
-        for new_position in self.model.grid.get_neighborhood(current_node.pos, True, False):
-
-            new_nodes = self.model.grid.get_cell_list_contents(new_position)
-            new_node = [agent for agent in new_nodes if isinstance(agent, Patch)][0]
-
-            if new_node.tree:
-                continue
-            children.append(new_node)
-
-        # Voor elk kind worden relevante waardes berekend en gecheckt of ze al
-        # in open/closed lijst zitten. 'Continue_function' gebruikt omdat continue
-        # niet goed werkte.
-        for child in children:
-            continue_function = False
-
-            for closed_child in closed_list:
-                if child == closed_child:
-                    continue_function = True
-            if continue_function:
-                continue
-
-            child.g = current_node.g + 1
-            child.h = (((child.pos[0] - end_node.pos[0]) ** 2) +
-                       ((child.pos[1] - end_node.pos[1]) ** 2))
-            child.f = child.g + child.h
-
-            # Child wordt alleen niet toegevoegd aan de lijst als het een
-            # oude 'generatie' is
-            for open_node in open_list:
-                if child == open_node and child.g > open_node.g:
-                    continue_function = True
-            if continue_function:
-                continue
+from coverage import Coverage
+from history import CellHistory
+from pathfinding import PursuitPlanner
 
-            # Child wordt toegevoegd aan de open list en de parent node
-            # wordt toegevoegd
-            open_list.append(child)
-            child.parent = current_node
+direction_list = [(-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0)]
+strategy_list = ["direction_traveling", "random_walking", "staying_put", "backtracking"]
 
 
 """
@@ -101,11 +15,13 @@ Hider agent kiest willekeurige cell in neighborhood en verplaatst.
 
 
 class Hider(Agent):
-    def __init__(self, unique_id, model, pos, age, speed):
+    def __init__(self, unique_id, model, pos, age, speed, strategy=None, history_limit=None):
         super().__init__(unique_id, model)
-        self.pos, self.pos_float = pos  # positie in grid en echte positie van agent
+        self.pos = pos
+        self.pos_float = pos  # positie in grid en echte positie van agent
         self.found = False  # of de agent gevonden is
-        self.cell_history = []  # wat het pad is dat de agent heeft gelopen, voor backtracking
+        # wat het pad is dat de agent heeft gelopen, voor backtracking (max history_limit posities)
+        self.cell_history = CellHistory(maxlen=history_limit)
         self.direction = ()  # richting van de agent
         self.speed = speed / 100  # snelheid van de agent
 
@@ -117,15 +33,17 @@ class Hider(Agent):
         # nodig voor direction_traveling
         self.direction_chosen = False
 
-        self.strategy = self.choose_strategy()
+        self.strategy = strategy if strategy is not None else self.choose_strategy()
 
     def step(self):
         if not self.lost:
             self.direction = self.get_direction()
-            self.pos_float = (self.pos_float[0] + self.direction[0], self.pos_float[1] + self.direction[1])
-            rounded_pos = (round(self.pos_float[0]), round(self.pos_float[1]))
-            self.model.grid.move_agent(self, rounded_pos)
-            self.cell_history.append(self.pos_float)
+            new_pos_float = (self.pos_float[0] + self.direction[0], self.pos_float[1] + self.direction[1])
+            rounded_pos = (round(new_pos_float[0]), round(new_pos_float[1]))
+            if not self.model.grid.out_of_bounds(rounded_pos):
+                self.pos_float = new_pos_float
+                self.model.grid.move_agent(self, rounded_pos)
+                self.cell_history.append(self.pos_float)
             if self.random.random() < 0.001:
                 self.lost = True
                 self.model.lost = True
@@ -137,21 +55,22 @@ class Hider(Agent):
             self.backtracking()
 
     def get_direction(self):
-        self.direction = random.choice(direction_list)
+        self.direction = self.random.choice(direction_list)
         new_direction = tuple(self.speed * i for i in self.direction)
         return new_direction
 
     def choose_strategy(self):
-        strategy_list = ["direction_traveling", "random_walking", "staying_put", "backtracking"]
         strategy = self.random.choice(strategy_list)
         return strategy
 
     def random_walking(self):
         if self.strategy == "random_walking":
             new_direction = self.get_direction()
-            self.pos_float = (self.pos_float[0] + new_direction[0], self.pos_float[1] + new_direction[1])
-            rounded_pos = (round(self.pos_float[0]), round(self.pos_float[1]))
-            self.model.grid.move_agent(self, rounded_pos)
+            new_pos_float = (self.pos_float[0] + new_direction[0], self.pos_float[1] + new_direction[1])
+            rounded_pos = (round(new_pos_float[0]), round(new_pos_float[1]))
+            if not self.model.grid.out_of_bounds(rounded_pos):
+                self.pos_float = new_pos_float
+                self.model.grid.move_agent(self, rounded_pos)
 
     def direction_traveling(self):
         if self.strategy == "direction_traveling":
@@ -178,9 +97,7 @@ class Hider(Agent):
 
     def backtracking(self):
         if self.strategy == "backtracking" and len(self.cell_history) != 0:
-            path = self.cell_history[::-1]
-            self.pos_float = path[0]
-            self.cell_history.pop()
+            self.pos_float = self.cell_history.pop()
             rounded_pos = (round(self.pos_float[0]), round(self.pos_float[1]))
             self.model.grid.move_agent(self, rounded_pos)
 
@@ -191,94 +108,80 @@ Seeker agent kijkt of Hider in gezichtsveld is. Zo ja, beweegt ernaartoe, zo nee
 
 
 class Seeker(Agent):
-    def __init__(self, unique_id, model, pos, start_pos, end_nodes):
+    def __init__(self, unique_id, model, pos, start_pos, end_nodes, radius=3):
         super().__init__(unique_id, model)
-        self.cell_history = []
-        self.grid_pos, self.pos = pos
+        self.cell_history = CellHistory()
+        self.pos = pos
         self.end_nodes_pos = end_nodes  # lijst met end_nodes
         self.start = start_pos  # startpositie
         self.end_node_count = 0  # telt bij welk item in de lijst end_nodes_pos zijn
         self.path_count = 0  # telt bij welke item in de lijst path we zijn
-        self.path = find_path(self)  # eerste path dat de Seeker gaat volgen
-        self.radius = 3
-
-        self.scanned_patches = []
         self.found = False
+        self.hider = None  # de gevonden Hider
+        self.pursuit = PursuitPlanner(model.terrain.tree, model.distances)  # eigen A* administratie per Seeker
+        self.path = self.find_path()  # eerste path dat de Seeker gaat volgen
+        self.radius = radius  # hoe ver de Seeker kan kijken
+
+        self.scanned_patches = Coverage(model.width, model.height)  # cellen die deze Seeker gezien heeft
 
     def step(self):
         # Als de end node bereikt is moet alles gereset worden en naar
         # de volgende node in de lijst gekeken worden.
 
         if self.model.lost:
-            if len(self.model.grid.get_cell_list_contents(self.pos)) == 3:
-                exit()
+            # Hider is ingehaald als ze in dezelfde cel staan
+            if self.hider is not None and self.hider.pos == self.pos:
+                self.model.found = True
+                return
 
             if not self.found:
-                if self.pos == self.end_nodes_pos[self.end_node_count]:
+                if self.end_node_count == len(self.end_nodes_pos):
+                    # klaar met zoeken, het model kan nog verder gestept worden
+                    return
+                # een onbereikbare end node (path is None) wordt overgeslagen
+                if self.pos == self.end_nodes_pos[self.end_node_count] or self.path is None:
                     self.start = self.pos
                     self.end_node_count += 1
-                    self.path = find_path(self)
+                    if self.end_node_count == len(self.end_nodes_pos):
+                        # alle end nodes gehad zonder de Hider te vinden
+                        self.model.running = False
+                        return
+                    self.path = self.find_path()
                     self.path_count = 0
             else:
-                self.path = find_path(self)
+                # de Hider beweegt, dus vanaf de huidige positie naar zijn huidige positie plannen
+                self.start = self.pos
+                self.end_nodes_pos = [self.hider.pos]
+                self.path = self.find_path()
                 self.path_count = 0
-            new_pos = self.path[self.path_count]
-            self.model.grid.move_agent(self, new_pos)
-            self.path_count += 1
+            if self.path and self.path_count < len(self.path):
+                new_pos = self.path[self.path_count]
+                self.model.grid.move_agent(self, new_pos)
+                self.path_count += 1
 
             self.scanning()
 
-    def scanning(self):
-        for cell in self.model.grid.iter_neighborhood(self.pos, True, True, 3):
-            if cell not in self.scanned_patches:
-                self.scanned_patches.append(cell)
+    def find_path(self):
+        # route van self.start naar de huidige end node, bomen zijn obstakels
+        end_node = self.end_nodes_pos[self.end_node_count]
+        if not self.found:
+            # de end nodes liggen vast, dus de route volgt direct uit hun afstandsveld
+            return self.model.distances.path(self.start, end_node)
+        # de Hider beweegt, de planner repareert de vorige zoektocht i.p.v. opnieuw te beginnen
+        return self.pursuit.plan(self.start, end_node)
 
-            for agent in self.model.grid.get_cell_list_contents(cell):
-                if type(agent) is Patch:
-                    agent.seen = True
-        # functie gaat elke richting af tot de radius van het zicht
-        for direction in direction_list:
-            tree_found = False
-            pos = self.pos
-            for _ in range(self.radius):
-                # stapsgewijs wordt in elke richting gekeken of er een boom staat of niet, zo ja dan wordt
-                # de loop gebroken en gaat hij door naar de volgende richting
-                pos = ((pos[0] + direction[0]), (pos[1] + direction[1]))
-                if not self.model.grid.out_of_bounds(pos):
-                    patch = [agent for agent in self.model.grid.get_cell_list_contents(pos)
-                             if isinstance(agent, Patch)][0]
-                    hider = [agent for agent in self.model.grid.get_cell_list_contents(pos)
-                             if isinstance(agent, Hider)]
-                    # checkt of de persoon gevonden is
-                    if len(hider) != 0:
-                        self.found = True
-                        self.end_nodes_pos = [hider[0].pos]
-                        self.end_node_count = 0
-                        self.start = self.pos
-                        hider[0].found = True
-                    if tree_found:
-                        if patch not in self.scanned_patches:
-                            patch.seen = False
-                        if patch in self.scanned_patches:
-                            self.scanned_patches.remove(patch)
-                    if patch.tree:
-                        tree_found = True
-
-
-class Patch(Agent):
-    parent: object
-
-    def __init__(self, pos, model, cost, parent=None):
-        super().__init__(pos, model)
-        self.pos = pos
-        self.seen = False
-        self.cost = cost
-        self.parent = parent
-        self.tree = False
-
-        self.g = 0
-        self.h = 0
-        self.f = 0
-
-    def step(self):
-        pass
+    def scanning(self):
+        # hele gezichtsveld in één keer, bomen blokkeren het zicht op de cellen erachter
+        xs, ys = self.model.visibility.field_of_view(self.pos, self.radius)
+        self.scanned_patches.mark(xs, ys)
+        self.model.coverage.mark(xs, ys)
+
+        # checkt of de persoon gevonden is
+        for agent in self.model.schedule.agents:
+            if isinstance(agent, Hider) and self.model.visibility.can_see(self.pos, agent.pos, self.radius):
+                self.found = True
+                self.hider = agent
+                self.end_nodes_pos = [agent.pos]
+                self.end_node_count = 0
+                self.start = self.pos
+                agent.found = True
@@ -0,0 +1,95 @@
+"""
+Headless runs van HaS zonder ModularServer, voor parameter sweeps over meerdere cores.
+Elke run wordt direct als regel naar een CSV geschreven, zodat resultaten niet verloren
+gaan als een sweep halverwege stopt.
+"""
+import csv
+import functools
+import itertools
+import multiprocessing
+
+import numpy
+
+from model import HaS
+
+result_fields = ["run", "seed", "width", "height", "density", "hider_speed", "hider_age", "hider_strategy",
+                 "end_nodes", "found", "steps", "lost_step", "search_steps", "searched"]
+
+
+def run_model(params, max_steps=10000):
+    """
+    Draait één HaS model tot het stopt (gevonden of alle end nodes gehad) of tot max_steps.
+    """
+    model = HaS(params["height"], params["width"], density=params["density"], seed=params["seed"],
+                hider_speed=params["hider_speed"], hider_age=params["hider_age"],
+                hider_strategy=params["hider_strategy"], end_nodes=params["end_nodes"])
+
+    lost_step = None  # tick waarop de Hider verdwaalt en het zoeken begint
+    while model.running and model.schedule.steps < max_steps:
+        model.step()
+        if model.lost and lost_step is None:
+            lost_step = model.schedule.steps
+
+    result = dict(params)
+    result["found"] = model.found
+    result["steps"] = model.schedule.steps
+    result["lost_step"] = lost_step
+    result["search_steps"] = model.schedule.steps - lost_step if lost_step is not None else None
+    result["searched"] = model.coverage.fraction
+    return result
+
+
+def spawn_seeds(master_seed, count):
+    """
+    Onafhankelijke seeds voor count replicates, afgeleid van één master seed met
+    numpy.random.SeedSequence. Zelfde master seed geeft altijd dezelfde seeds.
+    """
+    children = numpy.random.SeedSequence(master_seed).spawn(count)
+    return [int(child.generate_state(1, dtype=numpy.uint64)[0]) for child in children]
+
+
+def parameter_grid(densities, sizes, hider_speeds, hider_ages, hider_strategies, end_node_sets, replicates,
+                   master_seed=0):
+    """
+    Alle combinaties van de parameters, elke combinatie replicates keer.
+    sizes is een lijst met (width, height), een end_node set van None betekent de standaard hoeken.
+    Replicate i krijgt in elke combinatie dezelfde seed, zodat combinaties op hetzelfde
+    toeval vergeleken worden en een (parameters, seed) uitkomst altijd reproduceerbaar is.
+    """
+    seeds = spawn_seeds(master_seed, replicates)
+    runs = []
+    combinations = itertools.product(densities, sizes, hider_speeds, hider_ages, hider_strategies,
+                                      end_node_sets, seeds)
+    for run, (density, (width, height), speed, age, strategy, end_nodes, seed) in enumerate(combinations):
+        runs.append({"run": run, "seed": seed, "width": width, "height": height, "density": density,
+                     "hider_speed": speed, "hider_age": age, "hider_strategy": strategy,
+                     "end_nodes": end_nodes})
+    return runs
+
+
+def run_sweep(runs, path, processes=None, max_steps=10000):
+    """
+    Verdeelt de runs over een process pool en schrijft elke uitkomst naar path zodra die
+    klaar is. Bestaat het bestand al, dan worden de regels eraan toegevoegd.
+    """
+    with open(path, "a", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=result_fields)
+        if file.tell() == 0:
+            writer.writeheader()
+
+        worker = functools.partial(run_model, max_steps=max_steps)
+        with multiprocessing.Pool(processes) as pool:
+            for result in pool.imap_unordered(worker, runs, chunksize=4):
+                writer.writerow(result)
+                file.flush()
+
+
+if __name__ == "__main__":
+    runs = parameter_grid(densities=[0.1, 0.2, 0.3],
+                          sizes=[(30, 30), (60, 60), (100, 100)],
+                          hider_speeds=[25, 50, 100],
+                          hider_ages=[10],
+                          hider_strategies=["direction_traveling", "random_walking", "staying_put", "backtracking"],
+                          end_node_sets=[None],
+                          replicates=100)
+    run_sweep(runs, "results.csv")
@@ -0,0 +1,191 @@
+"""
+Checkpoints van een HaS run: de volledige toestand van het model (terrein, agents,
+coverage, datacollector en de stand van beide random generators) als één binair
+bestand. Een run die vanaf een checkpoint verder gaat loopt precies hetzelfde als de
+originele run. Met fork() kunnen vanaf één opgewarmde toestand veel varianten met elk
+een eigen seed gedraaid worden.
+"""
+import pickle
+
+from mesa import Model
+from mesa.datacollection import DataCollector
+from mesa.space import MultiGrid
+from mesa.time import RandomActivation
+import numpy
+
+from agent import Hider, Seeker
+from distances import DistanceOracle
+from history import CellHistory
+from model import HaS, compute_searched
+from terrain import Terrain
+from visibility import Visibility
+
+
+def coverage_state(coverage):
+    return {"bitmap": coverage.bitmap.copy(), "count": coverage.count,
+            "history": numpy.array(coverage.history, dtype=numpy.int64)}
+
+
+def restore_coverage(coverage, state):
+    coverage.bitmap[:] = state["bitmap"]
+    coverage.count = state["count"]
+    coverage.history = state["history"].tolist()
+
+
+def hider_state(hider):
+    return {"unique_id": hider.unique_id, "pos": hider.pos, "pos_float": hider.pos_float,
+            "cell_history": hider.cell_history.to_array(), "history_limit": hider.cell_history.maxlen,
+            "found": hider.found, "direction": hider.direction, "speed": hider.speed,
+            "lost": hider.lost, "age": hider.age, "destination_reached": hider.destination_reached,
+            "direction_chosen": hider.direction_chosen, "strategy": hider.strategy}
+
+
+def seeker_state(seeker):
+    pursuit = seeker.pursuit
+    # None (nog niets geleerd) wordt NaN, zodat het in een float array past
+    learned = numpy.array([numpy.nan if value is None else value for value in pursuit.learned])
+    return {"unique_id": seeker.unique_id, "pos": seeker.pos, "start": seeker.start,
+            "end_nodes_pos": list(seeker.end_nodes_pos), "end_node_count": seeker.end_node_count,
+            "path": seeker.path, "path_count": seeker.path_count, "found": seeker.found,
+            "hider": seeker.hider.unique_id if seeker.hider is not None else None,
+            "radius": seeker.radius, "cell_history": seeker.cell_history.to_array(),
+            "scanned_patches": coverage_state(seeker.scanned_patches),
+            "pursuit": {"learned": learned, "shift": pursuit.shift, "goal": pursuit.goal,
+                        "start": pursuit.start, "path": pursuit.path}}
+
+
+def snapshot(model):
+    """
+    Volledige toestand van model als dict met NumPy arrays en gewone Python waardes.
+    """
+    terrain = model.terrain
+    agents = []
+    for agent in model.schedule.agents:
+        if isinstance(agent, Hider):
+            agents.append(("hider", hider_state(agent)))
+        else:
+            agents.append(("seeker", seeker_state(agent)))
+    return {"width": model.width, "height": model.height, "density": model.density,
+            "seed": model._seed, "running": model.running, "found": model.found, "lost": model.lost,
+            "steps": model.schedule.steps, "time": model.schedule.time,
+            "tree": terrain.tree.copy(), "tree_density": terrain.density.copy(), "cost": terrain.cost.copy(),
+            "coverage": coverage_state(model.coverage),
+            # afstandsvelden meenemen, opnieuw uitrekenen is het duurste deel van een nieuw model
+            "landmarks": {target: numpy.array(field, dtype=numpy.int32)
+                          for target, field in model.distances.landmarks.items()},
+            "agents": agents,
+            "model_vars": {name: list(values) for name, values in model.datacollector.model_vars.items()},
+            "random": model.random.getstate(),
+            "rng": model.rng.bit_generator.state}
+
+
+def restore(state):
+    """
+    Nieuw HaS model in precies de toestand van snapshot(), zonder bomen te planten of
+    afstandsvelden uit te rekenen.
+    """
+    model = HaS.__new__(HaS, seed=state["seed"])
+    Model.__init__(model)
+    model.rng = numpy.random.default_rng()
+    width, height = state["width"], state["height"]
+    model.schedule = RandomActivation(model)
+    model.grid = MultiGrid(width, height, torus=False)
+    model.width = width
+    model.height = height
+    model.running = state["running"]
+    model.found = state["found"]
+    model.lost = state["lost"]
+    model.density = state["density"]
+    model.schedule.steps = state["steps"]
+    model.schedule.time = state["time"]
+
+    model.terrain = Terrain(width, height)
+    model.terrain.tree[:] = state["tree"]
+    model.terrain.density[:] = state["tree_density"]
+    model.terrain.cost[:] = state["cost"]
+    restore_coverage(model.terrain.coverage, state["coverage"])
+    model.visibility = Visibility(model.terrain.tree)
+    model.coverage = model.terrain.coverage
+
+    model.datacollector = DataCollector(model_reporters={"Searched": compute_searched})
+    for name, values in state["model_vars"].items():
+        model.datacollector.model_vars[name] = list(values)
+
+    model.distances = DistanceOracle(model.terrain.tree)
+    for target, field in state["landmarks"].items():
+        model.distances.landmarks[target] = field.tolist()
+
+    # zelfde volgorde in de schedule, anders schudt RandomActivation anders
+    hiders = {}
+    seekers = []
+    for kind, agent_state in state["agents"]:
+        if kind == "hider":
+            agent = restore_hider(model, agent_state)
+            hiders[agent.unique_id] = agent
+        else:
+            agent = restore_seeker(model, agent_state)
+            seekers.append((agent, agent_state["hider"]))
+        model.schedule.add(agent)
+        model.grid.place_agent(agent, agent_state["pos"])
+    for seeker, hider_id in seekers:
+        seeker.hider = hiders.get(hider_id)
+
+    model.random.setstate(state["random"])
+    model.rng.bit_generator.state = state["rng"]
+    return model
+
+
+def restore_hider(model, state):
+    hider = Hider(state["unique_id"], model, state["pos"], age=state["age"], speed=0,
+                  strategy=state["strategy"])
+    hider.pos_float = state["pos_float"]
+    hider.cell_history = CellHistory.from_array(state["cell_history"], maxlen=state["history_limit"])
+    for name in ("found", "direction", "speed", "lost", "destination_reached", "direction_chosen"):
+        setattr(hider, name, state[name])
+    return hider
+
+
+def restore_seeker(model, state):
+    seeker = Seeker(state["unique_id"], model, state["pos"], state["start"], list(state["end_nodes_pos"]),
+                    radius=state["radius"])
+    for name in ("end_node_count", "path", "path_count", "found"):
+        setattr(seeker, name, state[name])
+    seeker.cell_history = CellHistory.from_array(state["cell_history"])
+    restore_coverage(seeker.scanned_patches, state["scanned_patches"])
+
+    pursuit = seeker.pursuit
+    learned = state["pursuit"]["learned"]
+    pursuit.learned = [None if numpy.isnan(value) else int(value) for value in learned.tolist()]
+    pursuit.shift = state["pursuit"]["shift"]
+    pursuit.goal = state["pursuit"]["goal"]
+    pursuit.start = state["pursuit"]["start"]
+    pursuit.path = state["pursuit"]["path"]
+    if pursuit.goal is not None:
+        pursuit.bounds = model.distances.landmark_bounds(pursuit.goal)
+    return seeker
+
+
+def save(model, path):
+    with open(path, "wb") as file:
+        pickle.dump(snapshot(model), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load(path):
+    """
+    Toestand uit een checkpoint bestand; geef hem aan restore() of fork().
+    """
+    with open(path, "rb") as file:
+        return pickle.load(file)
+
+
+def fork(state, seed=None):
+    """
+    Nieuw model vanaf state. Zonder seed loopt het precies zoals de originele run,
+    met seed krijgen beide random generators een nieuwe stand en gaat de run vanaf
+    dit punt een eigen kant op.
+    """
+    model = restore(state)
+    if seed is not None:
+        model.random.seed(seed)
+        model.rng = numpy.random.default_rng(seed)
+    return model
@@ -0,0 +1,48 @@
+import numpy
+
+
+class Coverage:
+    """
+    Houdt in een bitmap ter grootte van de grid bij welke cellen al doorzocht zijn, met
+    een lopende telling. Markeren, weghalen en opzoeken zijn O(1) per cel, en het
+    percentage doorzocht gebied is altijd direct beschikbaar.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.bitmap = numpy.zeros((width, height), dtype=bool)
+        self.count = 0  # aantal cellen dat nu gemarkeerd is
+        self.history = []  # count na elke tick, via record()
+
+    def mark(self, xs, ys):
+        # meerdere cellen tegelijk, bijv. het hele gezichtsveld van de Seeker
+        new = ~self.bitmap[xs, ys]
+        if new.any():
+            # dubbele cellen in xs/ys maar één keer tellen
+            index = numpy.unique(numpy.asarray(xs)[new] * self.height + numpy.asarray(ys)[new])
+            self.bitmap.ravel()[index] = True
+            self.count += len(index)
+
+    def mark_cell(self, pos):
+        if not self.bitmap[pos]:
+            self.bitmap[pos] = True
+            self.count += 1
+
+    def unmark_cell(self, pos):
+        if self.bitmap[pos]:
+            self.bitmap[pos] = False
+            self.count -= 1
+
+    def __contains__(self, pos):
+        return bool(self.bitmap[pos])
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def fraction(self):
+        return self.count / (self.width * self.height)
+
+    def record(self):
+        self.history.append(self.count)
@@ -0,0 +1,112 @@
+from collections import OrderedDict, deque
+
+from pathfinding import neighbour_offsets
+
+
+class DistanceOracle:
+    """
+    Afstandsvelden over het bos: voor een doelcel wordt één keer met BFS de afstand van
+    elke cel tot dat doel berekend (8 buren, elke stap kost 1, bomen zijn obstakels).
+    Het terrein verandert niet tijdens een run, dus een route naar een bekend doel is
+    daarna gratis. De velden van de end nodes dienen ook als landmarks (ALT) voor A*
+    naar doelen die niet vastliggen, zoals de Hider.
+    """
+
+    def __init__(self, tree, cache_size=64):
+        self.width, self.height = tree.shape
+        self.blocked = tree.ravel().tolist()  # zelfde nummering als SearchContext
+        self.landmarks = {}  # doel -> afstandsveld, worden nooit weggegooid
+        self.fields = OrderedDict()  # overige doelen, de oudste gaan eruit als de cache vol is
+        self.cache_size = cache_size
+
+    def precompute(self, targets):
+        # velden voor vaste doelen (de end nodes) meteen bij het maken van het model
+        for target in targets:
+            if target not in self.landmarks:
+                self.landmarks[target] = self.compute_field(target)
+
+    def compute_field(self, target):
+        width, height = self.width, self.height
+        blocked = self.blocked
+        distance = [-1] * (width * height)  # -1 betekent onbereikbaar
+        target_index = target[0] * height + target[1]
+        distance[target_index] = 0
+        queue = deque([target_index])
+
+        while queue:
+            current = queue.popleft()
+            x, y = divmod(current, height)
+            new_distance = distance[current] + 1
+            for dx, dy in neighbour_offsets:
+                nx = x + dx
+                ny = y + dy
+                if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                    continue
+                child = nx * height + ny
+                if distance[child] == -1:
+                    # een boom krijgt wel een afstand (je kan er vandaan lopen),
+                    # maar er wordt niet doorheen gezocht
+                    distance[child] = new_distance
+                    if not blocked[child]:
+                        queue.append(child)
+        return distance
+
+    def field(self, target):
+        target = tuple(target)
+        if target in self.landmarks:
+            return self.landmarks[target]
+        if target in self.fields:
+            self.fields.move_to_end(target)
+        else:
+            self.fields[target] = self.compute_field(target)
+            if len(self.fields) > self.cache_size:
+                self.fields.popitem(last=False)
+        return self.fields[target]
+
+    def distance(self, pos, target):
+        distance = self.field(target)[pos[0] * self.height + pos[1]]
+        return distance if distance != -1 else None
+
+    def next_step(self, pos, target):
+        """
+        Buurcel van pos die één stap dichter bij target ligt, None als pos op target staat
+        of target onbereikbaar is.
+        """
+        distance = self.field(target)
+        current = pos[0] * self.height + pos[1]
+        if distance[current] <= 0:
+            return None
+        x, y = pos
+        for dx, dy in neighbour_offsets:
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or ny < 0 or nx >= self.width or ny >= self.height:
+                continue
+            child = nx * self.height + ny
+            # alleen door bomen heen als het het doel zelf is
+            if distance[child] == distance[current] - 1 and (distance[child] == 0 or not self.blocked[child]):
+                return nx, ny
+        return None
+
+    def path(self, start, target):
+        """
+        Kortste route van start naar target in hetzelfde formaat als find_path: de eerste
+        stap na start t/m target, of None als target niet bereikbaar is.
+        """
+        if self.distance(start, target) is None:
+            return None
+        path = []
+        pos = self.next_step(start, target)
+        while pos is not None:
+            path.append(pos)
+            pos = self.next_step(pos, target)
+        return path
+
+    def landmark_bounds(self, end):
+        # per landmark het veld en de afstand tot end, voor de ALT heuristiek. Staat end op
+        # een boom, dan loopt geen enkele route erdoorheen en geldt alleen
+        # d(landmark, end) - d(landmark, cel) nog als ondergrens
+        end_index = end[0] * self.height + end[1]
+        one_sided = self.blocked[end_index]
+        return [(field, field[end_index], one_sided) for field in self.landmarks.values()
+                if field[end_index] != -1]
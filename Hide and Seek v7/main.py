@@ -1,5 +1,6 @@
 from model import HaS
-from agent import Seeker, Patch, Hider
+from agent import Seeker, Hider
+from raster_canvas import RasterCanvas, RasterServer
 import mesa
 
 
@@ -22,30 +23,14 @@ def agent_portrayal(agent):
                      "r": 0.5}
         return portrayal
 
-    if type(agent) is Patch:
-        portrayal = {}
-        if agent.tree:
-            portrayal["Color"] = "#00FF00"
-        elif agent.seen:
-            portrayal["Color"] = "#D6F5D6"
-        else:
-            portrayal["Color"] = "#964B00"
-
-        portrayal["Shape"] = "rect"
-        portrayal["Filled"] = "True"
-        portrayal["Layer"] = 0
-        portrayal["w"] = 1
-        portrayal["h"] = 1
-        return portrayal
-
 
 width = 30
 height = 30
 start_node = (5,29)
 end_nodes = [(25,6)]
 
-grid = mesa.visualization.CanvasGrid(agent_portrayal, width, height, 500, 500)
-server = mesa.visualization.ModularServer(
+grid = RasterCanvas(agent_portrayal, width, height, 500, 500)
+server = RasterServer(
     HaS, [grid], "Hide and Seek", {"width": width, "height": height})
 
 server.port = 8521  # The default
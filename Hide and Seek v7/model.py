@@ -1,8 +1,18 @@
 from mesa import Model
+from mesa.datacollection import DataCollector
 from mesa.space import MultiGrid
 from mesa.time import RandomActivation
+import numpy
 
-from agent import Hider, Seeker, Patch
+from agent import Hider, Seeker
+from distances import DistanceOracle
+from terrain import Terrain
+from visibility import Visibility
+
+
+def compute_searched(model):
+    # fractie van het bos dat door de Seekers gezien is
+    return model.coverage.fraction
 
 
 class HaS(Model):
@@ -10,8 +20,11 @@ class HaS(Model):
     Model heeft height en width als attributen. Plaatst 2 agenten op willekeurige cells.
     """
 
-    def __init__(self, height, width, density=0.2, seed=3):
+    def __init__(self, height, width, density=0.2, seed=3, radius=3, hider_speed=50, hider_age=10,
+                 hider_strategy=None, end_nodes=None, history_limit=None):
         super().__init__(seed=seed)
+        # alle toeval loopt via self.random (mesa) en self.rng (numpy), beide uit seed
+        self.rng = numpy.random.default_rng(seed)
 
         self.schedule = RandomActivation(self)
         self.grid = MultiGrid(width, height, torus=False)
@@ -22,21 +35,27 @@ class HaS(Model):
         self.lost = False
         self.density = density
 
-        for i, x, y in self.grid.coord_iter():  # patches maken
-            pos = (x, y)
-            cost = 1
-            agent_patch = Patch(pos, self, cost)
-            if self.random.random() < self.density:
-                agent_patch.tree = True
-            self.schedule.add(agent_patch) # dit weg doen?
-            self.grid.place_agent(agent_patch, pos)
+        # terrein staat in arrays op het model, niet meer als Patch agent in grid en schedule
+        self.terrain = Terrain(width, height, cost=1)
+        self.terrain.plant_trees(density, self.random)
+        self.visibility = Visibility(self.terrain.tree)
+        self.coverage = self.terrain.coverage
+
+        self.datacollector = DataCollector(model_reporters={"Searched": compute_searched})
+
+        # posities schalen mee met de grid, bij 30x30 zijn het de oude vaste posities
+        pos_hider = (2 * width // 3, height // 3)
+        start_pos = (4, height - 1)
+        if end_nodes is None:
+            end_nodes = [(4, 3), (width - 4, height - 4), (width - 4, 3), (3, height - 4)]
 
-        pos_hider = (20, 10)
-        start_pos = (4, 29)
-        end_nodes = [(4, 3), (26, 26), (26, 3), (3, 26)]
+        # afstandsvelden naar de end nodes één keer per kaart, daarna is plannen gratis
+        self.distances = DistanceOracle(self.terrain.tree)
+        self.distances.precompute(end_nodes)
 
-        hider_agent = Hider(1, self, pos_hider, age=10, speed = 50)
-        seeker_agent = Seeker(2, self, pos, start_pos, end_nodes)
+        hider_agent = Hider(1, self, pos_hider, age=hider_age, speed=hider_speed, strategy=hider_strategy,
+                            history_limit=history_limit)
+        seeker_agent = Seeker(2, self, start_pos, start_pos, end_nodes, radius=radius)
 
         self.schedule.add(hider_agent)
         self.schedule.add(seeker_agent)
@@ -49,5 +68,7 @@ class HaS(Model):
         Run one step of the model.
         """
         self.schedule.step()
+        self.coverage.record()
+        self.datacollector.collect(self)
         if self.found:
             self.running = False
@@ -0,0 +1,211 @@
+import heapq
+
+# zelfde buren als grid.get_neighborhood(pos, moore=True, include_center=False)
+neighbour_offsets = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+class SearchContext:
+    """
+    Houdt de g-waardes, parents en closed list van A* bij in eigen arrays, los van het
+    terrein. Elke Seeker heeft zijn eigen context, zodat meerdere agents tegelijk
+    (ook in threads of processen) kunnen plannen zonder elkaars waardes te overschrijven.
+    """
+
+    def __init__(self, obstacles, distances=None):
+        self.width, self.height = obstacles.shape
+        size = self.width * self.height
+        # cellen worden genummerd als x * height + y, zelfde volgorde als obstacles.ravel()
+        self.blocked = obstacles.ravel().tolist()
+        self.g = [0] * size
+        self.parent = [-1] * size
+        # in plaats van alles te resetten per zoektocht wordt bijgehouden in welke
+        # zoektocht een cel voor het laatst bezocht/gesloten is
+        self.visited = [0] * size
+        self.closed = [0] * size
+        self.search_id = 0
+
+        # optioneel een DistanceOracle, waarvan de landmarks de heuristiek scherper maken
+        self.distances = distances
+        self.bounds = []
+        self.expanded = []
+
+    def heuristic(self, x, y, end):
+        # elke stap (ook diagonaal) kost 1, dus de Chebyshev afstand is precies de
+        # afstand zonder bomen en overschat dus nooit
+        h = max(abs(x - end[0]), abs(y - end[1]))
+        # ALT: |d(landmark, cel) - d(landmark, end)| is ook een ondergrens voor de afstand
+        index = x * self.height + y
+        for field, end_distance, one_sided in self.bounds:
+            distance = field[index]
+            if distance != -1:
+                h = max(h, end_distance - distance if one_sided else abs(distance - end_distance))
+        return h
+
+    def find_path(self, start, end):
+        """
+        A* van start naar end. Geeft een lijst met posities van de eerste stap na start
+        t/m end, of None als end niet bereikbaar is.
+        """
+        self.search_id += 1
+        search_id = self.search_id
+        if self.distances is not None:
+            self.bounds = self.distances.landmark_bounds(end)
+        self.expanded = []  # gesloten cellen van deze zoektocht
+        width, height = self.width, self.height
+        blocked, g, parent, visited, closed = self.blocked, self.g, self.parent, self.visited, self.closed
+
+        start_index = start[0] * height + start[1]
+        end_index = end[0] * height + end[1]
+        g[start_index] = 0
+        parent[start_index] = -1
+        visited[start_index] = search_id
+
+        h = self.heuristic(start[0], start[1], end)
+        open_heap = [(h, h, start_index)]
+
+        while open_heap:
+            f, h, current = heapq.heappop(open_heap)
+            # een cel kan vaker in de heap staan, alleen de eerste (goedkoopste) telt
+            if closed[current] == search_id:
+                continue
+            closed[current] = search_id
+            self.expanded.append(current)
+
+            if current == end_index:
+                return self.reconstruct_path(current)
+
+            x, y = divmod(current, height)
+            new_g = g[current] + 1
+            for dx, dy in neighbour_offsets:
+                nx = x + dx
+                ny = y + dy
+                if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                    continue
+                child = nx * height + ny
+                # de end node zelf mag een boom zijn, bijv. als de Hider daar staat
+                if (blocked[child] and child != end_index) or closed[child] == search_id:
+                    continue
+                if visited[child] != search_id or new_g < g[child]:
+                    visited[child] = search_id
+                    g[child] = new_g
+                    parent[child] = current
+                    child_h = self.heuristic(nx, ny, end)
+                    heapq.heappush(open_heap, (new_g + child_h, child_h, child))
+
+        return None
+
+    def reconstruct_path(self, current):
+        # met terugwerkende kracht de route vinden, startpositie zelf hoort er niet bij
+        path = []
+        while self.parent[current] != -1:
+            path.append(divmod(current, self.height))
+            current = self.parent[current]
+        return path[::-1]
+
+
+class PursuitPlanner(SearchContext):
+    """
+    Incrementele planner voor het achtervolgen van de Hider (Moving Target Adaptive A*).
+    Na elke zoektocht wordt voor alle gesloten cellen de echte afstand tot het doel
+    onthouden als heuristiek. Beweegt het doel, dan worden al die waardes in één keer
+    gecorrigeerd met h(nieuw doel) in plaats van weggegooid, dus volgende zoektochten
+    lopen bijna direct langs de route. Staat het doel stil of is het maar een cel
+    opgeschoven, dan wordt de oude route hergebruikt als die aantoonbaar nog de kortste is.
+    """
+
+    def __init__(self, obstacles, distances=None):
+        super().__init__(obstacles, distances)
+        self.learned = [None] * (self.width * self.height)
+        self.shift = 0  # correctie voor alle geleerde waardes samen
+        self.goal = None
+        self.start = None
+        self.path = None  # laatste route, vanaf self.start
+
+    def heuristic(self, x, y, end):
+        h = super().heuristic(x, y, end)
+        learned = self.learned[x * self.height + y]
+        if learned is not None:
+            h = max(h, learned - self.shift)
+        return h
+
+    def plan(self, start, goal):
+        """
+        Route van start naar goal in hetzelfde formaat als find_path.
+        """
+        start = tuple(start)
+        goal = tuple(goal)
+        remainder = self.remainder(start)
+
+        if goal != self.goal:
+            if self.goal is not None:
+                # h(s) := max(H(s), h(s) - h(nieuw doel)), met h t.o.v. het oude doel
+                self.shift += self.goal_shift(goal)
+            self.goal = goal
+            if self.distances is not None:
+                self.bounds = self.distances.landmark_bounds(goal)
+            remainder = self.repair(remainder, goal)
+
+        # de oude route (eventueel verlengd) is zeker de kortste als hij niet langer is
+        # dan de ondergrens van de heuristiek, dan hoeft er niet gezocht te worden
+        if remainder is not None and len(remainder) <= self.heuristic(start[0], start[1], goal):
+            self.start = start
+            self.path = remainder
+            self.expanded = []
+            return list(remainder)
+
+        self.start = start
+        self.path = self.find_path(start, goal)
+        if self.path is not None:
+            goal_g = len(self.path)
+            for index in self.expanded:
+                self.learned[index] = goal_g - self.g[index] + self.shift
+        return self.path
+
+    def goal_shift(self, goal):
+        x, y = goal
+        if not self.blocked[x * self.height + y]:
+            return self.heuristic(x, y, self.goal)
+        # staat het nieuwe doel op een boom, dan kan geen route door die boom naar het oude
+        # doel lopen; elke route komt binnen via een vrije buur, dus die buren tellen
+        neighbours = [self.heuristic(x + dx, y + dy, self.goal) for dx, dy in neighbour_offsets
+                      if 0 <= x + dx < self.width and 0 <= y + dy < self.height
+                      and not self.blocked[(x + dx) * self.height + y + dy]]
+        if not neighbours:
+            return self.heuristic(x, y, self.goal)
+        return max(neighbours) - 1
+
+    def remainder(self, start):
+        # deel van de vorige route dat nog voor de Seeker ligt
+        if self.path is None:
+            return None
+        if start == self.start:
+            return list(self.path)
+        if start in self.path:
+            return self.path[self.path.index(start) + 1:]
+        return None
+
+    def repair(self, path, goal):
+        # doel is een paar cellen verschoven: route inkorten of één stap verlengen
+        if path is None:
+            return None
+        if goal in path:
+            path = path[:path.index(goal) + 1]
+        else:
+            end = path[-1] if path else self.start
+            if max(abs(goal[0] - end[0]), abs(goal[1] - end[1])) != 1:
+                return None
+            path = path + [goal]
+        # alleen het doel zelf mag een boom zijn; het oude doel kan er een zijn en is
+        # nu een tussenstap, dan moet er opnieuw gezocht worden
+        blocked, height = self.blocked, self.height
+        if any(blocked[x * height + y] for x, y in path[:-1]):
+            return None
+        return path
+
+
+def find_path(obstacles, start, end):
+    """
+    Losse A* zoektocht over een boolean obstacle mask (obstacles[x, y] is True als er
+    een boom staat), met een nieuwe SearchContext.
+    """
+    return SearchContext(obstacles).find_path(start, end)
@@ -0,0 +1,197 @@
+from mesa import Model
+from mesa.datacollection import DataCollector
+import numpy
+
+from agent import direction_list, strategy_list
+from model import compute_searched
+from terrain import Terrain
+from visibility import Visibility
+
+directions = numpy.array(direction_list, dtype=float)
+DIRECTION_TRAVELING, RANDOM_WALKING, STAYING_PUT, BACKTRACKING = range(len(strategy_list))
+
+
+def compute_found(model):
+    return int(model.hider_found.sum())
+
+
+class PopulationHaS(Model):
+    """
+    Hide and Seek met veel Hiders en Seekers op één kaart (search and rescue). Posities,
+    snelheden, richtingen en strategieën staan in NumPy arrays en worden per tick in één
+    keer bijgewerkt, in plaats van per agent via de MultiGrid.
+
+    Hiders volgen dezelfde regels als Hider: stappen van speed in een richting uit
+    direction_list, met kans lost_chance per tick verdwalen en daarna hun strategie uit
+    strategy_list volgen. Seekers lopen in een rechte lijn (zoals get_direction in v8)
+    langs hun end nodes, of naar de Hider die ze gezien hebben. Bomen blokkeren het zicht
+    maar niet het lopen.
+    """
+
+    def __init__(self, height, width, n_hiders=100, n_seekers=10, density=0.2, seed=3, radius=3,
+                 hider_speed=50, seeker_speed=100, hider_strategy=None, lost_chance=0.001, end_nodes=None):
+        super().__init__(seed=seed)
+        self.rng = numpy.random.default_rng(seed)
+        self.width = width
+        self.height = height
+        self.running = True
+        self.steps = 0
+        self.radius = radius
+        self.lost_chance = lost_chance
+
+        self.terrain = Terrain(width, height, cost=1)
+        self.terrain.plant_trees(density, self.random)
+        self.visibility = Visibility(self.terrain.tree)
+        self.coverage = self.terrain.coverage
+
+        # Hiders: beginnen op willekeurige cellen zonder boom
+        free_x, free_y = numpy.nonzero(~self.terrain.tree)
+        start = self.rng.choice(len(free_x), size=n_hiders)
+        self.hider_pos = numpy.column_stack((free_x[start], free_y[start])).astype(float)
+        self.hider_speed = numpy.full(n_hiders, hider_speed / 100)
+        self.hider_direction = numpy.zeros((n_hiders, 2))
+        self.hider_direction_chosen = numpy.zeros(n_hiders, dtype=bool)
+        self.hider_lost = numpy.zeros(n_hiders, dtype=bool)
+        self.hider_found = numpy.zeros(n_hiders, dtype=bool)
+        if hider_strategy is None:
+            self.hider_strategy = self.rng.integers(len(strategy_list), size=n_hiders)
+        else:
+            self.hider_strategy = numpy.full(n_hiders, strategy_list.index(hider_strategy))
+        # cell_history van alle Hiders in één array, wordt verdubbeld als hij vol is
+        self.history = numpy.zeros((n_hiders, 64, 2))
+        self.history_length = numpy.zeros(n_hiders, dtype=numpy.int64)
+
+        # Seekers: standaard elk een eigen baan van boven naar beneden
+        if end_nodes is None:
+            lanes = ((numpy.arange(n_seekers) + 0.5) * width / n_seekers).astype(int)
+            end_nodes = [[(x, 3), (x, height - 4)] for x in lanes]
+        if n_seekers:
+            self.end_nodes = numpy.array(end_nodes, dtype=float)  # (n_seekers, aantal end nodes, 2)
+        else:
+            self.end_nodes = numpy.zeros((0, 1, 2))  # alleen Hiders
+        self.seeker_pos = numpy.column_stack((self.end_nodes[:, 0, 0], numpy.full(n_seekers, height - 1)))
+        self.seeker_speed = numpy.full(n_seekers, seeker_speed / 100)
+        self.end_node_count = numpy.zeros(n_seekers, dtype=numpy.int64)
+        self.seeker_target = numpy.full(n_seekers, -1)  # index van de gevolgde Hider, -1 is geen
+
+        self.datacollector = DataCollector(model_reporters={"Searched": compute_searched, "Found": compute_found})
+
+    @property
+    def hider_cells(self):
+        return numpy.rint(self.hider_pos).astype(numpy.int64)
+
+    @property
+    def seeker_cells(self):
+        return numpy.rint(self.seeker_pos).astype(numpy.int64)
+
+    def random_directions(self, count):
+        return directions[self.rng.integers(len(directions), size=count)]
+
+    def in_bounds(self, pos):
+        cells = numpy.rint(pos)
+        return ((cells[:, 0] >= 0) & (cells[:, 0] < self.width) &
+                (cells[:, 1] >= 0) & (cells[:, 1] < self.height))
+
+    def push_history(self, index):
+        full = self.history_length[index] == self.history.shape[1]
+        if full.any():
+            self.history = numpy.concatenate((self.history, numpy.zeros_like(self.history)), axis=1)
+        self.history[index, self.history_length[index]] = self.hider_pos[index]
+        self.history_length[index] += 1
+
+    def step_hiders(self):
+        active = ~self.hider_found
+        lost = self.hider_lost & active
+
+        # nog niet verdwaald: willekeurige richting uit direction_list, net als Hider.step
+        walking = numpy.flatnonzero(active & ~lost)
+        new_pos = self.hider_pos[walking] + self.random_directions(len(walking)) * self.hider_speed[walking, None]
+        inside = self.in_bounds(new_pos)
+        moved = walking[inside]
+        self.hider_pos[moved] = new_pos[inside]
+        self.push_history(moved)
+        newly_lost = walking[self.rng.random(len(walking)) < self.lost_chance]
+        self.hider_lost[newly_lost] = True
+        self.hider_direction_chosen[newly_lost] = False
+
+        # random_walking: elke tick een nieuwe richting
+        index = numpy.flatnonzero(lost & (self.hider_strategy == RANDOM_WALKING))
+        new_pos = self.hider_pos[index] + self.random_directions(len(index)) * self.hider_speed[index, None]
+        inside = self.in_bounds(new_pos)
+        self.hider_pos[index[inside]] = new_pos[inside]
+
+        # direction_traveling: één keer een richting kiezen en die blijven volgen tot de rand
+        index = numpy.flatnonzero(lost & (self.hider_strategy == DIRECTION_TRAVELING))
+        choose = index[~self.hider_direction_chosen[index]]
+        self.hider_direction[choose] = self.random_directions(len(choose)) * self.hider_speed[choose, None]
+        self.hider_direction_chosen[choose] = True
+        new_pos = self.hider_pos[index] + self.hider_direction[index]
+        inside = self.in_bounds(new_pos)
+        self.hider_pos[index[inside]] = new_pos[inside]
+        self.hider_strategy[index[~inside]] = STAYING_PUT
+
+        # backtracking: terug over de eigen cell_history
+        index = numpy.flatnonzero(lost & (self.hider_strategy == BACKTRACKING) & (self.history_length > 0))
+        self.history_length[index] -= 1
+        self.hider_pos[index] = self.history[index, self.history_length[index]]
+
+    def step_seekers(self):
+        searching = self.end_node_count < self.end_nodes.shape[1]
+        seekers = numpy.flatnonzero(searching | (self.seeker_target >= 0))
+
+        # doel per Seeker: de gevolgde Hider, anders de huidige end node
+        targets = numpy.empty((len(seekers), 2))
+        following = self.seeker_target[seekers] >= 0
+        targets[following] = self.hider_pos[self.seeker_target[seekers[following]]]
+        waypoint = seekers[~following]
+        targets[~following] = self.end_nodes[waypoint, self.end_node_count[waypoint]]
+
+        # zelfde heading als get_direction: x,y max 1, daarna maal speed, niet voorbij het doel
+        offset = targets - self.seeker_pos[seekers]
+        distance = numpy.abs(offset).max(axis=1)
+        speed = self.seeker_speed[seekers]
+        arrive = distance <= speed
+        scale = numpy.divide(speed, distance, out=numpy.zeros_like(speed), where=~arrive)
+        self.seeker_pos[seekers] += offset * scale[:, None]
+        self.seeker_pos[seekers[arrive]] = targets[arrive]
+
+        # end node bereikt: door naar de volgende
+        cells = self.seeker_cells[waypoint]
+        reached = (cells == self.end_nodes[waypoint, self.end_node_count[waypoint]]).all(axis=1)
+        self.end_node_count[waypoint[reached]] += 1
+
+    def scanning(self):
+        seeker_cells = self.seeker_cells
+        hider_cells = self.hider_cells
+        for cell in seeker_cells.tolist():
+            xs, ys = self.visibility.field_of_view(cell, self.radius)
+            self.coverage.mark(xs, ys)
+
+        # Hiders binnen de radius van een Seeker, daarna pas zichtlijn controleren
+        offset = numpy.abs(hider_cells[None, :, :] - seeker_cells[:, None, :]).max(axis=2)
+        close = (offset <= self.radius) & ~self.hider_found[None, :]
+        for seeker, hider in zip(*numpy.nonzero(close)):
+            if offset[seeker, hider] == 0:
+                # ingehaald: Hider is gevonden, Seeker gaat verder met zijn end nodes
+                self.hider_found[hider] = True
+                self.seeker_target[self.seeker_target == hider] = -1
+            elif self.seeker_target[seeker] < 0 and self.visibility.can_see(
+                    tuple(seeker_cells[seeker]), tuple(hider_cells[hider]), self.radius):
+                self.seeker_target[seeker] = hider
+
+    def step(self):
+        """
+        Run one step of the model.
+        """
+        self.step_hiders()
+        if self.hider_lost.any():
+            self.step_seekers()
+            self.scanning()
+        self.steps += 1
+        self.coverage.record()
+        self.datacollector.collect(self)
+
+        searching = (self.end_node_count < self.end_nodes.shape[1]) | (self.seeker_target >= 0)
+        # zonder Seekers (alleen Hiders) loopt het model door tot het gestopt wordt
+        if self.hider_found.all() or (len(searching) and not searching.any()):
+            self.running = False
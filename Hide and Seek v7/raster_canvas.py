@@ -0,0 +1,122 @@
+"""
+Visualisatie voor grote kaarten. In plaats van elke tick een portrayal dict per cel te
+sturen (zoals CanvasGrid) gaat het terrein één keer als bitmap naar de browser, en
+daarna per tick alleen wat veranderd is: cellen die gezien (of weer ongezien) zijn en
+agents die verplaatst zijn. De browser tekent het terrein als afbeelding met één pixel
+per cel, dus in- en uitzoomen kost geen nieuwe data.
+
+Wat een browser al heeft verschilt per verbinding (tweede tab, opnieuw verbinden), dus
+RasterServer laat RasterCanvas per websocket bijhouden wat er gestuurd is.
+"""
+import base64
+import os
+
+import numpy
+from mesa.visualization.ModularVisualization import ModularServer, SocketHandler, VisualizationElement
+
+
+def encode(array):
+    return base64.b64encode(array.tobytes()).decode("ascii")
+
+
+def pack_bits(bitmap):
+    # één bit per cel in dezelfde volgorde als de grid (index x * height + y)
+    return encode(numpy.packbits(bitmap.ravel()))
+
+
+class RasterCanvas(VisualizationElement):
+    """
+    Canvas die het terrein als raster en daarna alleen veranderingen naar de browser
+    stuurt. Scrollen zoomt in rond de muis, slepen verschuift de kaart en dubbelklikken
+    zet het beeld terug.
+    """
+
+    local_includes = ["RasterCanvas.js"]
+    local_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def __init__(self, portrayal_method, grid_width, grid_height, canvas_width=500, canvas_height=500):
+        super().__init__()
+        self.portrayal_method = portrayal_method
+        self.js_code = "elements.push(new RasterCanvas({}, {}, {}, {}));".format(
+            canvas_width, canvas_height, grid_width, grid_height)
+        self.connection = None  # websocket waarvoor nu gerenderd wordt, gezet door RasterSocketHandler
+        self.baselines = {}  # per websocket: wat die browser al heeft
+
+    def render(self, model):
+        terrain = model.terrain
+        baseline = self.baselines.get(self.connection)
+        if baseline is None or baseline.model is not model:
+            # nieuwe verbinding of nieuw model (start of reset): alles één keer sturen
+            baseline = self.baselines[self.connection] = Baseline(model, terrain.seen.copy())
+            frame = {"type": "full", "width": terrain.width, "height": terrain.height,
+                     "tree": pack_bits(terrain.tree), "seen": pack_bits(terrain.seen)}
+        else:
+            flipped = numpy.flatnonzero(terrain.seen.ravel() != baseline.seen.ravel())
+            baseline.seen.ravel()[flipped] ^= True
+            frame = {"type": "delta", "flip": encode(flipped.astype("<i4"))}
+
+        frame["step"] = model.schedule.steps
+        frame["agents"], frame["removed"] = self.agent_changes(model, baseline)
+        return frame
+
+    def forget(self, connection):
+        self.baselines.pop(connection, None)
+
+    def agent_changes(self, model, baseline):
+        # alleen agents die nieuw zijn, verplaatst zijn of van uiterlijk veranderd
+        changed = []
+        current = {}
+        for agent in model.schedule.agents:
+            if agent.pos is None:
+                continue
+            portrayal = self.portrayal_method(agent)
+            if portrayal is None:
+                continue
+            state = [agent.pos[0], agent.pos[1], portrayal["Color"], portrayal.get("r", 1)]
+            current[agent.unique_id] = state
+            if baseline.agents.get(agent.unique_id) != state:
+                changed.append([agent.unique_id] + state)
+        removed = [unique_id for unique_id in baseline.agents if unique_id not in current]
+        baseline.agents = current
+        return changed, removed
+
+
+class Baseline:
+    """
+    Wat één browser al heeft: het model, de gezien-bitmap en de agents van het laatste frame.
+    """
+
+    def __init__(self, model, seen):
+        self.model = model
+        self.seen = seen
+        self.agents = {}
+
+
+class RasterSocketHandler(SocketHandler):
+    """
+    SocketHandler die de RasterCanvas elementen vertelt voor welke verbinding ze renderen.
+    """
+
+    def raster_canvases(self):
+        return [element for element in self.application.visualization_elements
+                if isinstance(element, RasterCanvas)]
+
+    def on_message(self, message):
+        for element in self.raster_canvases():
+            element.connection = self
+        super().on_message(message)
+
+    def on_close(self):
+        for element in self.raster_canvases():
+            element.forget(self)
+
+
+class RasterServer(ModularServer):
+    """
+    ModularServer met RasterSocketHandler, zodat elke tab zijn eigen volledige frame krijgt.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # gaat voor de standaard /ws handler van ModularServer
+        self.add_handlers(r".*", [(r"/ws", RasterSocketHandler)])
@@ -0,0 +1,47 @@
+import numpy
+
+from coverage import Coverage
+
+
+class Terrain:
+    """
+    Terrein van het bos als NumPy arrays op het model, in plaats van een Patch agent per cel.
+    Alle arrays worden geïndexeerd als [x, y], net als de MultiGrid.
+    """
+
+    def __init__(self, width, height, cost=1):
+        self.width = width
+        self.height = height
+        self.tree = numpy.zeros((width, height), dtype=bool)  # obstakels voor find_path en zicht
+        self.density = numpy.zeros((width, height))
+        # of een Seeker de cel gezien heeft, bijgehouden door coverage zodat de telling klopt
+        self.coverage = Coverage(width, height)
+        self.seen = self.coverage.bitmap
+        self.cost = numpy.full((width, height), cost, dtype=numpy.int64)
+
+    def plant_trees(self, density, random):
+        # elke cel is met kans density een boom, zelfde volgorde als coord_iter
+        self.density[:] = density
+        for x in range(self.width):
+            for y in range(self.height):
+                if random.random() < density:
+                    self.tree[x, y] = True
+
+    def is_tree(self, pos):
+        return bool(self.tree[pos])
+
+    def is_seen(self, pos):
+        return bool(self.seen[pos])
+
+    def mark_seen(self, pos, seen=True):
+        if seen:
+            self.coverage.mark_cell(pos)
+        else:
+            self.coverage.unmark_cell(pos)
+
+    def cell(self, pos):
+        # alle waardes van één cel, handig voor de visualisatie
+        return {"tree": bool(self.tree[pos]),
+                "density": float(self.density[pos]),
+                "seen": bool(self.seen[pos]),
+                "cost": int(self.cost[pos])}
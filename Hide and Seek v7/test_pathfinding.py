@@ -0,0 +1,48 @@
+import numpy
+
+from pathfinding import PursuitPlanner, find_path
+
+
+def valid_route(obstacles, start, path):
+    # elke stap is een buurcel en alleen het doel mag een boom zijn
+    previous = start
+    for x, y in path:
+        if max(abs(x - previous[0]), abs(y - previous[1])) != 1:
+            return False
+        previous = (x, y)
+    return not any(obstacles[pos] for pos in path[:-1])
+
+
+def test_repair_does_not_route_through_old_goal_on_tree():
+    # muur op x = 5 met een opening op (5, 2); de Hider staat eerst op boom (5, 1)
+    obstacles = numpy.zeros((10, 4), dtype=bool)
+    obstacles[5, :] = True
+    obstacles[5, 2] = False
+    planner = PursuitPlanner(obstacles)
+    planner.plan((0, 1), (5, 1))
+    path = planner.plan((0, 1), (6, 1))
+    assert valid_route(obstacles, (0, 1), path)
+    assert len(path) == len(find_path(obstacles, (0, 1), (6, 1)))
+
+
+def test_pursuit_matches_find_path():
+    rng = numpy.random.default_rng(0)
+    for trial in range(20):
+        obstacles = rng.random((40, 30)) < 0.3
+        planner = PursuitPlanner(obstacles)
+        seeker = (0, 0)
+        obstacles[seeker] = False
+        goal = (int(rng.integers(40)), int(rng.integers(30)))
+        for step in range(50):
+            path = planner.plan(seeker, goal)
+            expected = find_path(obstacles, seeker, goal)
+            if expected is None:
+                assert path is None
+            else:
+                assert valid_route(obstacles, seeker, path)
+                assert len(path) == len(expected)
+                if len(path) > 1:
+                    seeker = path[0]
+            # doel schuift een cel op, soms op een boom
+            dx, dy = rng.integers(-1, 2, size=2)
+            goal = (min(max(goal[0] + int(dx), 0), 39), min(max(goal[1] + int(dy), 0), 29))
@@ -0,0 +1,20 @@
+from population import PopulationHaS
+
+
+def test_without_seekers():
+    # alleen Hiders: geen end nodes, niemand wordt gevonden en het model blijft lopen
+    model = PopulationHaS(40, 40, n_hiders=20, n_seekers=0, seed=1, lost_chance=0.05)
+    assert model.end_nodes.shape == (0, 1, 2)
+    for _ in range(50):
+        model.step()
+    assert model.running
+    assert model.datacollector.model_vars["Found"][-1] == 0
+    assert model.hider_lost.any()
+
+
+def test_with_seekers_and_own_end_nodes():
+    end_nodes = [[(5, 3), (5, 36)], [(30, 3), (30, 36)]]
+    model = PopulationHaS(40, 40, n_hiders=20, n_seekers=2, seed=1, end_nodes=end_nodes)
+    assert model.end_nodes.shape == (2, 2, 2)
+    for _ in range(20):
+        model.step()
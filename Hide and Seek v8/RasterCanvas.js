@@ -0,0 +1,140 @@
+// Client side of raster_canvas.py: keeps the terrain as an image with one pixel per
+// cell and only applies the changes the server sends each tick.
+const RasterCanvas = function (canvasWidth, canvasHeight, gridWidth, gridHeight) {
+  const canvas = document.createElement("canvas");
+  canvas.width = canvasWidth;
+  canvas.height = canvasHeight;
+  canvas.className = "world-grid";
+  const parent = document.createElement("div");
+  parent.style.height = canvasHeight + "px";
+  parent.appendChild(canvas);
+  document.getElementById("elements").appendChild(parent);
+  const context = canvas.getContext("2d");
+
+  const raster = document.createElement("canvas");
+  const rasterContext = raster.getContext("2d");
+  let image = null;
+  let width = gridWidth;
+  let height = gridHeight;
+  let codes = null;
+  let palette = [];
+  let seen = null;
+  const agents = new Map();
+
+  // view in cells: zoom 1 shows the whole map
+  let zoom = 1;
+  let offsetX = 0;
+  let offsetY = 0;
+
+  const seenColor = [214, 245, 214];
+
+  const parseColor = (hex) => [1, 3, 5].map((i) => parseInt(hex.slice(i, i + 2), 16));
+
+  const decodeBytes = (text) => Uint8Array.from(atob(text), (c) => c.charCodeAt(0));
+
+  const decodeBits = (text, count) => {
+    const bytes = decodeBytes(text);
+    const bits = new Uint8Array(count);
+    for (let i = 0; i < count; i++) bits[i] = (bytes[i >> 3] >> (7 - (i & 7))) & 1;
+    return bits;
+  };
+
+  const decodeIndices = (text) => new Int32Array(decodeBytes(text).buffer);
+
+  const paintCell = (index) => {
+    const x = Math.floor(index / height);
+    const y = index % height;
+    // y = 0 is the bottom row, as in CanvasGrid
+    const pixel = ((height - 1 - y) * width + x) * 4;
+    const color = seen[index] ? seenColor : palette[codes[index]];
+    image.data[pixel] = color[0];
+    image.data[pixel + 1] = color[1];
+    image.data[pixel + 2] = color[2];
+    image.data[pixel + 3] = 255;
+  };
+
+  const cellSize = () => [(canvasWidth / width) * zoom, (canvasHeight / height) * zoom];
+
+  const draw = () => {
+    context.setTransform(1, 0, 0, 1, 0, 0);
+    context.clearRect(0, 0, canvasWidth, canvasHeight);
+    if (image === null) return;
+    const [cellWidth, cellHeight] = cellSize();
+    context.setTransform(cellWidth, 0, 0, cellHeight, -offsetX * cellWidth, -offsetY * cellHeight);
+    context.imageSmoothingEnabled = false;
+    context.drawImage(raster, 0, 0);
+    for (const [x, y, color, r] of agents.values()) {
+      context.beginPath();
+      context.fillStyle = color;
+      context.arc(x + 0.5, height - 1 - y + 0.5, r / 2, 0, 2 * Math.PI);
+      context.fill();
+    }
+  };
+
+  this.render = (data) => {
+    if (data.type === "full") {
+      width = data.width;
+      height = data.height;
+      raster.width = width;
+      raster.height = height;
+      image = rasterContext.createImageData(width, height);
+      codes = decodeBytes(data.codes);
+      palette = data.palette.map(parseColor);
+      seen = decodeBits(data.seen, width * height);
+      agents.clear();
+      for (let i = 0; i < width * height; i++) paintCell(i);
+    } else if (image !== null) {
+      for (const index of decodeIndices(data.flip)) {
+        seen[index] ^= 1;
+        paintCell(index);
+      }
+    }
+    if (image !== null) rasterContext.putImageData(image, 0, 0);
+    for (const id of data.removed) agents.delete(id);
+    for (const [id, x, y, color, r] of data.agents) agents.set(id, [x, y, color, r]);
+    draw();
+  };
+
+  this.reset = () => {
+    image = null;
+    agents.clear();
+    zoom = 1;
+    offsetX = 0;
+    offsetY = 0;
+    draw();
+  };
+
+  // zoom around the mouse, drag to pan, double click for the whole map
+  canvas.addEventListener("wheel", (event) => {
+    event.preventDefault();
+    const [cellWidth, cellHeight] = cellSize();
+    const cellX = offsetX + event.offsetX / cellWidth;
+    const cellY = offsetY + event.offsetY / cellHeight;
+    zoom = Math.max(1, zoom * (event.deltaY < 0 ? 1.25 : 0.8));
+    const [newWidth, newHeight] = cellSize();
+    offsetX = cellX - event.offsetX / newWidth;
+    offsetY = cellY - event.offsetY / newHeight;
+    draw();
+  });
+
+  let dragStart = null;
+  canvas.addEventListener("mousedown", (event) => {
+    dragStart = [event.offsetX, event.offsetY, offsetX, offsetY];
+  });
+  canvas.addEventListener("mousemove", (event) => {
+    if (dragStart === null) return;
+    const [cellWidth, cellHeight] = cellSize();
+    offsetX = dragStart[2] - (event.offsetX - dragStart[0]) / cellWidth;
+    offsetY = dragStart[3] - (event.offsetY - dragStart[1]) / cellHeight;
+    draw();
+  });
+  window.addEventListener("mouseup", () => {
+    dragStart = null;
+  });
+  canvas.addEventListener("dblclick", () => {
+    zoom = 1;
+    offsetX = 0;
+    offsetY = 0;
+    draw();
+  });
+};
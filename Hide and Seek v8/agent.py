@@ -1,8 +1,15 @@
+import logging
+
 from mesa import Agent
-import random
+
+from coverage import Coverage
+from history import CellHistory
 
 direction_list = [(-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0)]
 
+# debug events van de Seeker, staan standaard uit (zie eventlog.py in de root)
+seeker_log = logging.getLogger("hide_and_seek.seeker")
+
 
 """
 Hider agent kiest willekeurige cell in neighborhood en verplaatst.
@@ -10,12 +17,13 @@ Hider agent kiest willekeurige cell in neighborhood en verplaatst.
 
 
 class Hider(Agent):
-    def __init__(self, unique_id, model, pos, age, speed):
+    def __init__(self, unique_id, model, pos, age, speed, history_limit=None):
         super().__init__(unique_id, model)
         self.pos = pos
         self.pos_float = pos  # positie in grid en echte positie van agent
         self.found = False  # of de agent gevonden is
-        self.cell_history = []  # wat het pad is dat de agent heeft gelopen, voor backtracking
+        # wat het pad is dat de agent heeft gelopen, voor backtracking (max history_limit posities)
+        self.cell_history = CellHistory(maxlen=history_limit)
         self.direction = ()  # richting van de agent
         self.speed = speed / 100  # snelheid van de agent
 
@@ -46,7 +54,7 @@ class Hider(Agent):
             self.backtracking()
 
     def get_direction(self):
-        self.direction = random.choice(direction_list)
+        self.direction = self.random.choice(direction_list)
         new_direction = tuple(self.speed * i for i in self.direction)
         return new_direction
 
@@ -88,9 +96,7 @@ class Hider(Agent):
 
     def backtracking(self):
         if self.strategy == "backtracking" and len(self.cell_history) != 0:
-            path = self.cell_history[::-1]
-            self.pos_float = path[0]
-            self.cell_history.pop()
+            self.pos_float = self.cell_history.pop()
             rounded_pos = (round(self.pos_float[0]), round(self.pos_float[1]))
             self.model.grid.move_agent(self, rounded_pos)
 
@@ -103,7 +109,7 @@ Seeker agent kijkt of Hider in gezichtsveld is. Zo ja, beweegt ernaartoe, zo nee
 class Seeker(Agent):
     def __init__(self, unique_id, model, pos, end_nodes, speed):
         super().__init__(unique_id, model)
-        self.cell_history = []
+        self.cell_history = CellHistory()
         self.pos = pos
         self.pos_float = pos  # positie in grid en echte positie van agent
         self.direction = ()  # richting van de agent
@@ -112,7 +118,7 @@ class Seeker(Agent):
         self.end_node_count = 0  # telt bij welk item in de lijst end_nodes_pos zijn
         self.radius = 3
 
-        self.scanned_patches = []
+        self.scanned_patches = Coverage(model.width, model.height)  # cellen die deze Seeker gezien heeft
         self.found = False
 
     def step(self):
@@ -139,48 +145,23 @@ class Seeker(Agent):
     def get_direction(self, end_node):
         # transformeert de afstand naar nieuwe node naar een heading met x,y max 1
         direction = (end_node[0] - self.pos_float[0], end_node[1] - self.pos_float[1])
-        print("End nodes", end_node[0], end_node[1])
-        print("Float pos", self.pos_float[0], self.pos_float[1])
         self.direction = (direction[0]/max(abs(direction[0]), abs(direction[1]))), direction[1]/max(abs(direction[0]), abs(direction[1]))
-        print(self.direction)
+        if seeker_log.isEnabledFor(logging.DEBUG):
+            seeker_log.debug("get_direction", extra={"data": {
+                "step": self.model.schedule.steps, "agent": self.unique_id, "end_node": end_node,
+                "pos_float": self.pos_float, "direction": self.direction}})
 
     def scanning(self):
-        for cell in self.model.grid.iter_neighborhood(self.pos, True, True, 3):
-            if cell not in self.scanned_patches:
-                self.scanned_patches.append(cell)
-
-            for agent in self.model.grid.get_cell_list_contents(cell):
-                if type(agent) is Patch:
-                    agent.seen = True
-        # functie gaat elke richting af tot de radius van het zicht
-        for direction in direction_list:
-            pos = self.pos
-            for _ in range(self.radius):
-                # stapsgewijs wordt in elke richting gekeken of er een boom staat of niet, zo ja dan wordt
-                # de loop gebroken en gaat hij door naar de volgende richting
-                pos = ((pos[0] + direction[0]), (pos[1] + direction[1]))
-                if not self.model.grid.out_of_bounds(pos):
-                    hider = [agent for agent in self.model.grid.get_cell_list_contents(pos)
-                             if isinstance(agent, Hider)]
-                    # checkt of de persoon gevonden is
-                    if len(hider) != 0:
-                        self.found = True
-                        self.end_nodes_pos = [hider[0].pos]
-                        self.end_node_count = 0
-                        self.start = self.pos
-                        hider[0].found = True
-
-
-
-class Patch(Agent):
-    parent: object
-
-    def __init__(self, pos, model, density, parent=None):
-        super().__init__(pos, model)
-        self.pos = pos
-        self.seen = False
-        self.density = density
-
-
-    def step(self):
-        pass
+        # hele gezichtsveld in één keer; v8 heeft nog geen bomen, dus dat is het hele vierkant
+        xs, ys = self.model.visibility.field_of_view(self.pos, self.radius)
+        self.scanned_patches.mark(xs, ys)
+        self.model.terrain.coverage.mark(xs, ys)
+
+        # checkt of de persoon gevonden is
+        for agent in self.model.schedule.agents:
+            if isinstance(agent, Hider) and self.model.visibility.can_see(self.pos, agent.pos, self.radius):
+                self.found = True
+                self.end_nodes_pos = [agent.pos]
+                self.end_node_count = 0
+                self.start = self.pos
+                agent.found = True
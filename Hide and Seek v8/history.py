@@ -0,0 +1,70 @@
+import numpy
+
+
+class CellHistory:
+    """
+    Gelopen posities als stack in een NumPy array, voor backtracking. append en pop zijn
+    O(1) en pop geeft de laatste positie terug zonder de rest te kopiëren. Met maxlen is
+    het een ring buffer: is hij vol, dan wordt de oudste positie overschreven. Zonder
+    maxlen groeit de array (verdubbelen) als hij vol is. Met maxlen=0 wordt niets bewaard.
+    """
+
+    def __init__(self, maxlen=None, capacity=64):
+        if maxlen is not None and maxlen < 0:
+            raise ValueError("maxlen must be None or >= 0")
+        self.maxlen = maxlen
+        self.data = numpy.empty((maxlen if maxlen is not None else capacity, 2))
+        self.first = 0  # index van de oudste positie in data
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, pos):
+        if self.maxlen == 0:
+            # geen geschiedenis bijhouden
+            return
+        size = len(self.data)
+        if self.length == size:
+            if self.maxlen is not None:
+                # vol: oudste positie overschrijven
+                self.data[self.first] = pos
+                self.first = (self.first + 1) % size
+                return
+            self.data = numpy.concatenate((self.to_array(), numpy.empty_like(self.data)))
+            self.first = 0
+            size = len(self.data)
+        self.data[(self.first + self.length) % size] = pos
+        self.length += 1
+
+    def pop(self):
+        if self.length == 0:
+            raise IndexError("pop from empty CellHistory")
+        self.length -= 1
+        x, y = self.data[(self.first + self.length) % len(self.data)].tolist()
+        return x, y
+
+    def last(self):
+        if self.length == 0:
+            raise IndexError("last of empty CellHistory")
+        x, y = self.data[(self.first + self.length - 1) % len(self.data)].tolist()
+        return x, y
+
+    def clear(self):
+        self.first = 0
+        self.length = 0
+
+    def to_array(self):
+        # kopie van oud naar nieuw, als (length, 2) array
+        index = (self.first + numpy.arange(self.length)) % len(self.data)
+        return self.data[index]
+
+    def __iter__(self):
+        return iter([tuple(pos) for pos in self.to_array().tolist()])
+
+    @classmethod
+    def from_array(cls, positions, maxlen=None):
+        history = cls(maxlen=maxlen, capacity=max(len(positions), 64))
+        for pos in positions:
+            history.append(pos)
+        return history
@@ -1,6 +1,8 @@
 from model import HaS
-from agent import Seeker, Patch, Hider
+from agent import Seeker, Hider
+from raster_canvas import RasterCanvas, RasterServer
 import mesa
+import numpy
 
 
 
@@ -22,23 +24,17 @@ def agent_portrayal(agent):
                      "r": 0.5}
         return portrayal
 
-    if type(agent) is Patch:
-        portrayal = {}
-        if agent.seen:
-            portrayal["Color"] = "#D6F5D6"
-        elif agent.density > 0.25:
-            portrayal["Color"] = "#023020"
-        elif agent.density < 0.15:
-            portrayal["Color"] = "#AFE1AF"
-        else:
-            portrayal["Color"] = "#097969"
-
-        portrayal["Shape"] = "rect"
-        portrayal["Filled"] = "True"
-        portrayal["Layer"] = 0
-        portrayal["w"] = 1
-        portrayal["h"] = 1
-        return portrayal
+
+# kleuren van het bos per dichtheidsklasse, gezien cellen tekent RasterCanvas lichtgroen
+terrain_palette = ["#097969", "#023020", "#AFE1AF"]
+
+
+def terrain_classes(terrain):
+    # index in terrain_palette per cel: 0 daartussen, 1 dicht bos, 2 open bos
+    classes = numpy.zeros((terrain.width, terrain.height), dtype=numpy.uint8)
+    classes[terrain.density > 0.25] = 1
+    classes[terrain.density < 0.15] = 2
+    return classes
 
 
 width = 100
@@ -46,8 +42,8 @@ height = 100
 start_node = (5,29)
 end_nodes = [(25,6)]
 
-grid = mesa.visualization.CanvasGrid(agent_portrayal, width, height, 750, 750)
-server = mesa.visualization.ModularServer(
+grid = RasterCanvas(agent_portrayal, terrain_classes, terrain_palette, width, height, 750, 750)
+server = RasterServer(
     HaS, [grid], "Hide and Seek", {"width": width, "height": height})
 
 server.port = 8521  # The default
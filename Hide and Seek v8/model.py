@@ -3,7 +3,9 @@ from mesa.space import MultiGrid
 from mesa.time import RandomActivation
 import numpy
 
-from agent import Hider, Seeker, Patch
+from agent import Hider, Seeker
+from terrain import Terrain
+from visibility import Visibility
 
 
 class HaS(Model):
@@ -13,6 +15,7 @@ class HaS(Model):
 
     def __init__(self, height, width, density=0.2, seed=3):
         super().__init__(seed=seed)
+        self.rng = numpy.random.default_rng(seed)  # numpy stream van dit model, naast self.random
 
         self.schedule = RandomActivation(self)
         self.grid = MultiGrid(width, height, torus=False)
@@ -23,11 +26,10 @@ class HaS(Model):
         self.lost = False
         self.density = density
 
-        for i, x, y in self.grid.coord_iter():  # patches maken
-            pos = (x, y)
-            agent_patch = Patch(pos, self, density)
-            agent_patch.density = numpy.random.normal(density)
-            self.grid.place_agent(agent_patch, pos)
+        # terrein als arrays in plaats van een Patch agent per cel
+        self.terrain = Terrain(width, height)
+        self.terrain.random_density(density, self.rng)
+        self.visibility = Visibility(self.terrain.tree)
 
         pos_hider = (20, 10)
         pos = (4, 29)
@@ -0,0 +1,85 @@
+import functools
+
+import numpy
+
+
+def round_half_away(values):
+    # symmetrisch afronden, zodat links en rechts van de kijker dezelfde cellen geraakt worden
+    return (numpy.sign(values) * numpy.floor(numpy.abs(values) + 0.5)).astype(numpy.int64)
+
+
+class Visibility:
+    """
+    Berekent het gezichtsveld van een positie in één NumPy stap over het boom-masker.
+    Voor elke cel binnen de radius (vierkant, net als iter_neighborhood met moore=True)
+    wordt de lijn vanaf de kijker gesampled; een boom op die lijn blokkeert het zicht op
+    alles erachter, de boom zelf is wel zichtbaar. Het terrein verandert niet tijdens een
+    run, dus resultaten worden per (positie, radius) bewaard, als bitmasker met één bit per
+    cel in het vierkant (ruim 200 bytes bij radius 20); xs en ys worden daaruit afgeleid.
+    """
+
+    def __init__(self, tree, cache_size=4096):
+        self.width, self.height = tree.shape
+        self.tree = tree
+        self.rays = {}  # per radius: offsets van de cellen en de samples op de lijn ernaartoe
+        self.padded = {}  # per radius: boom-masker met een rand van radius cellen zonder bomen
+        self.field_of_view_cached = functools.lru_cache(maxsize=cache_size)(self.compute_field_of_view)
+
+    def rays_for(self, radius):
+        if radius not in self.rays:
+            size = 2 * radius + 1
+            offsets = numpy.arange(-radius, radius + 1)
+            dx, dy = numpy.meshgrid(offsets, offsets, indexing="ij")
+            dx = dx.ravel()
+            dy = dy.ravel()
+            steps = numpy.maximum(numpy.abs(dx), numpy.abs(dy))
+
+            # tussenliggende punten op de lijn, de kijker en de cel zelf niet meegerekend;
+            # kortere lijnen worden aangevuld met de kijker, die blokkeert nooit
+            k = numpy.arange(1, radius)
+            t = k[None, :] / numpy.maximum(steps, 1)[:, None]
+            between = k[None, :] < steps[:, None]
+            sx = numpy.where(between, round_half_away(dx[:, None] * t), 0)
+            sy = numpy.where(between, round_half_away(dy[:, None] * t), 0)
+            samples = (sx + radius) * size + (sy + radius)
+
+            self.rays[radius] = (dx, dy, samples)
+        return self.rays[radius]
+
+    def padded_tree(self, radius):
+        if radius not in self.padded:
+            self.padded[radius] = numpy.pad(self.tree, radius, constant_values=False)
+        return self.padded[radius]
+
+    def compute_field_of_view(self, pos, radius):
+        size = 2 * radius + 1
+        dx, dy, samples = self.rays_for(radius)
+        x, y = pos
+
+        window = self.padded_tree(radius)[x:x + size, y:y + size].ravel().copy()
+        window[radius * size + radius] = False  # eigen cel blokkeert niet
+        visible = ~window[samples].any(axis=1)
+
+        xs = dx + x
+        ys = dy + y
+        visible &= (xs >= 0) & (ys >= 0) & (xs < self.width) & (ys < self.height)
+        return numpy.packbits(visible).tobytes()
+
+    def field_of_view(self, pos, radius):
+        """
+        Geeft twee arrays (xs, ys) met alle zichtbare cellen vanaf pos, inclusief pos zelf.
+        """
+        dx, dy, samples = self.rays_for(radius)
+        packed = self.field_of_view_cached(tuple(pos), radius)
+        visible = numpy.unpackbits(numpy.frombuffer(packed, dtype=numpy.uint8), count=len(dx)).view(bool)
+        return dx[visible] + pos[0], dy[visible] + pos[1]
+
+    def can_see(self, pos, target, radius):
+        dx = target[0] - pos[0]
+        dy = target[1] - pos[1]
+        if abs(dx) > radius or abs(dy) > radius:
+            return False
+        packed = self.field_of_view_cached(tuple(pos), radius)
+        # zelfde volgorde als de offsets in rays_for, packbits zet de eerste cel in het hoogste bit
+        index = (dx + radius) * (2 * radius + 1) + dy + radius
+        return bool(packed[index >> 3] >> (7 - (index & 7)) & 1)
@@ -0,0 +1,146 @@
+import json
+import os
+from operator import attrgetter
+
+import numpy as np
+import pandas as pd
+from mesa.datacollection import DataCollector
+
+
+class ColumnarDataCollector(DataCollector):
+    """DataCollector that keeps agent reporters as columns on disk.
+
+    Model reporters and tables work as in Mesa's DataCollector. Agent-level
+    values go into preallocated NumPy buffers of chunk_size rows, one per
+    column plus Step and AgentID. A full buffer is written to path as one .npy
+    shard per column, and chunks.json lists the step range of every chunk.
+    Memory use therefore stays at one chunk, however long the run is. The
+    last, partial chunk is only written by close(), so call it at the end of
+    a run or use the collector as a context manager.
+
+    Agent reporters take the same attribute strings or functions of an agent
+    as DataCollector, but every value has to fit in a NumPy column.
+    """
+    def __init__(self, model_reporters=None, agent_reporters=None, tables=None,
+                 path="agent_data", chunk_size=1_000_000):
+        super().__init__(model_reporters=model_reporters, tables=tables)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.columns = {}
+        for name, reporter in (agent_reporters or {}).items():
+            if type(reporter) is str:
+                reporter = attrgetter(reporter)
+            self.columns[name] = reporter
+        self.buffers = None
+        self.rows = 0
+        self.chunks = []
+        os.makedirs(path, exist_ok=True)
+
+    def _allocate(self, records):
+        self.buffers = {name: np.empty(self.chunk_size, dtype=np.asarray(values).dtype)
+                        for name, values in records.items()}
+
+    def _record_agents(self, model):
+        agents = model.schedule.agents
+        records = {"Step": np.full(len(agents), model.schedule.steps),
+                   "AgentID": [agent.unique_id for agent in agents]}
+        for name, reporter in self.columns.items():
+            records[name] = [reporter(agent) for agent in agents]
+        return records
+
+    def collect(self, model):
+        """Collect all the data for the given model object."""
+        super().collect(model)
+        if not self.columns:
+            return
+        records = self._record_agents(model)
+        if self.buffers is None:
+            self._allocate(records)
+
+        count = len(records["Step"])
+        start = 0
+        while start < count:
+            end = min(count, start + self.chunk_size - self.rows)
+            for name, values in records.items():
+                self.buffers[name][self.rows:self.rows + end - start] = values[start:end]
+            self.rows += end - start
+            start = end
+            if self.rows == self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        """Write the buffered rows to disk as a new chunk."""
+        if not self.rows:
+            return
+        number = len(self.chunks)
+        for name, buffer in self.buffers.items():
+            np.save(self._shard(name, number), buffer[:self.rows])
+        steps = self.buffers["Step"]
+        self.chunks.append({"rows": self.rows,
+                            "first_step": int(steps[0]),
+                            "last_step": int(steps[self.rows - 1])})
+        self.rows = 0
+        with open(os.path.join(self.path, "chunks.json"), "w") as file:
+            json.dump({"columns": list(self.buffers), "chunks": self.chunks}, file)
+
+    def close(self):
+        """Write the rows still buffered, so the directory holds the whole run."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _shard(self, name, number):
+        return os.path.join(self.path, "{}_{:06d}.npy".format(name, number))
+
+    def get_agent_vars_dataframe(self, steps=None, columns=None):
+        """Create a pandas DataFrame from the agent variables.
+
+        Only the chunks that hold one of the requested steps are read, and
+        only the requested columns, memory-mapped. Steps is a (first, last)
+        range or a list of steps; None means all of them. The index is
+        (Step, AgentID), as in DataCollector.
+        """
+        if columns is None:
+            columns = list(self.columns)
+        parts = []
+        for number, chunk in enumerate(self.chunks):
+            if _overlaps(steps, chunk["first_step"], chunk["last_step"]):
+                parts.append(self._read(
+                    lambda name: np.load(self._shard(name, number), mmap_mode="r"),
+                    steps, columns))
+        if self.rows:
+            parts.append(self._read(lambda name: self.buffers[name][:self.rows], steps, columns))
+
+        if not parts:
+            index = pd.MultiIndex.from_arrays([[], []], names=["Step", "AgentID"])
+            return pd.DataFrame(columns=columns, index=index)
+        return pd.concat(parts)
+
+    def _read(self, load, steps, columns):
+        step = load("Step")
+        rows = _select(step, steps)
+        index = pd.MultiIndex.from_arrays([step[rows], load("AgentID")[rows]],
+                                          names=["Step", "AgentID"])
+        return pd.DataFrame({name: load(name)[rows] for name in columns}, index=index)
+
+
+def _overlaps(steps, first, last):
+    if steps is None:
+        return True
+    if isinstance(steps, tuple):
+        return steps[0] <= last and first <= steps[1]
+    return any(first <= step <= last for step in steps)
+
+
+def _select(step, steps):
+    if steps is None:
+        return slice(None)
+    if isinstance(steps, tuple):
+        # Steps only go up within a chunk, so the range is one slice
+        return slice(np.searchsorted(step, steps[0], side="left"),
+                     np.searchsorted(step, steps[1], side="right"))
+    return np.isin(step, steps)
@@ -0,0 +1,89 @@
+"""Structured event log for the models, on top of the standard logging module.
+
+Models emit events on named loggers, e.g. "hide_and_seek.seeker" or
+"flocking", with the event fields in extra={"data": {...}}. Hot paths guard the
+call with logger.isEnabledFor(logging.DEBUG), so with logging off an event
+costs one cached level check. Logger levels select per component what is
+written.
+
+    handler = eventlog.enable("events.jsonl", components=["hide_and_seek"])
+    ...
+    eventlog.disable(handler)
+"""
+import json
+import logging
+
+
+class JsonLinesHandler(logging.Handler):
+    """Writes every record as one JSON object per line.
+
+    Lines are kept in memory and written in blocks of buffer_size records, on
+    flush() and on close().
+    """
+    def __init__(self, path, buffer_size=10000):
+        super().__init__()
+        self.file = open(path, "a", encoding="utf-8")
+        self.buffer_size = buffer_size
+        self.buffer = []
+
+    def emit(self, record):
+        event = {"time": record.created,
+                 "level": record.levelname,
+                 "component": record.name,
+                 "event": record.getMessage()}
+        data = getattr(record, "data", None)
+        if data:
+            event.update(data)
+        self.buffer.append(json.dumps(event, default=str))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self.buffer:
+                self.file.write("\n".join(self.buffer) + "\n")
+                self.buffer = []
+            self.file.flush()
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+        super().close()
+
+
+# Loggers of the models in this repo
+MODEL_COMPONENTS = ("flocking", "hide_and_seek")
+
+
+def enable(path, level=logging.DEBUG, components=MODEL_COMPONENTS, buffer_size=10000):
+    """Send events of the given components (logger names) to a JSONL file.
+
+    The handler is attached to the component loggers themselves, which stop
+    propagating, so the events do not reach other handlers such as a
+    basicConfig console handler. disable() puts levels and propagation back.
+    """
+    handler = JsonLinesHandler(path, buffer_size)
+    handler.components = list(components)
+    handler.previous_levels = {}
+    handler.previous_propagate = {}
+    for component in handler.components:
+        logger = logging.getLogger(component)
+        handler.previous_levels[component] = logger.level
+        handler.previous_propagate[component] = logger.propagate
+        logger.setLevel(level)
+        logger.propagate = False
+        logger.addHandler(handler)
+    return handler
+
+
+def disable(handler):
+    """Detach a handler from enable() again and write what is left in its buffer."""
+    for component in handler.components:
+        logger = logging.getLogger(component)
+        logger.removeHandler(handler)
+        logger.setLevel(handler.previous_levels[component])
+        logger.propagate = handler.previous_propagate[component]
+    handler.close()
@@ -0,0 +1,147 @@
+"""Headless rendering of grid models to video, without a browser.
+
+Each tick the simulation loop only turns the model state into a small array
+of colour codes, one per cell. A background thread maps the codes to RGB,
+scales the image up and pipes it to ffmpeg, so encoding runs next to the
+simulation instead of inside it.
+
+    writer = VideoWriter("run.mp4", HIDE_AND_SEEK_PALETTE, fps=60, scale=4)
+    render_run(model, hide_and_seek_frame, writer, steps=10000)
+"""
+import queue
+import subprocess
+import threading
+
+import numpy as np
+
+
+def hex_palette(colors):
+    return np.array([[int(color[i:i + 2], 16) for i in (1, 3, 5)] for color in colors], dtype=np.uint8)
+
+
+# Same colours as the Hide and Seek v7 visualisation (main.py and RasterCanvas.js)
+GROUND, SEEN, TREE, HIDER, SEEKER = range(5)
+HIDE_AND_SEEK_PALETTE = hex_palette(["#964B00", "#D6F5D6", "#00FF00", "#FF0000", "#0000FF"])
+
+
+def profile_palette(traits):
+    """One colour per binary profile of the given length, evenly spread over the hues."""
+    hue = np.arange(2 ** traits) / 2 ** traits
+    # HSV to RGB with full saturation and value
+    k = (np.array([5, 3, 1])[None, :] + hue[:, None] * 6) % 6
+    rgb = 1 - np.clip(np.minimum(k, 4 - k), 0, 1)
+    return (rgb * 255).astype(np.uint8)
+
+
+def hide_and_seek_frame(model):
+    """Colour codes of a HaS or PopulationHaS model, indexed [x, y] like the grid."""
+    terrain = model.terrain
+    codes = np.full((terrain.width, terrain.height), GROUND, dtype=np.uint8)
+    codes[terrain.seen] = SEEN
+    codes[terrain.tree] = TREE
+    if hasattr(model, "hider_cells"):
+        for cells, code in ((model.hider_cells, HIDER), (model.seeker_cells, SEEKER)):
+            cells = cells[(cells >= 0).all(axis=1) & (cells[:, 0] < terrain.width) & (cells[:, 1] < terrain.height)]
+            codes[cells[:, 0], cells[:, 1]] = code
+    else:
+        for agent in model.schedule.agents:
+            if agent.pos is not None:
+                codes[agent.pos] = SEEKER if type(agent).__name__ == "Seeker" else HIDER
+    return codes
+
+
+def cultural_diffusion_frame(model):
+    """Colour codes of a CulturalDiff model: the profile of each agent read as a binary number."""
+    codes = np.zeros((model.width, model.height), dtype=np.uint8)
+    for agent in model.schedule.agents:
+        codes[agent.pos] = int("".join(str(int(trait)) for trait in agent.profile), 2)
+    return codes
+
+
+class VideoWriter:
+    """Encodes frames of colour codes to a video file with ffmpeg.
+
+    write() copies the frame into a queue and returns; a background thread
+    does the colouring and encoding. Only when max_queue frames are waiting
+    does write() wait for the encoder, which bounds the memory use.
+    """
+    def __init__(self, path, palette, fps=30, scale=4, max_queue=256, ffmpeg="ffmpeg",
+                 codec="libx264"):
+        self.path = path
+        self.palette = np.asarray(palette, dtype=np.uint8)
+        self.fps = fps
+        self.scale = scale
+        self.ffmpeg = ffmpeg
+        self.codec = codec
+        self.frames = queue.Queue(max_queue)
+        self.process = None
+        self.thread = None
+        self.error = None
+
+    def start(self, width, height):
+        # libx264 with yuv420p needs an even width and height
+        self.size = (width * self.scale + width * self.scale % 2, height * self.scale + height * self.scale % 2)
+        command = [self.ffmpeg, "-y", "-loglevel", "error",
+                   "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", "{}x{}".format(*self.size),
+                   "-r", str(self.fps), "-i", "-",
+                   "-c:v", self.codec, "-pix_fmt", "yuv420p", self.path]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        self.thread = threading.Thread(target=self.encode, daemon=True)
+        self.thread.start()
+
+    def write(self, codes):
+        if self.error is not None:
+            raise self.error
+        if self.process is None:
+            self.start(*codes.shape)
+        self.frames.put(np.array(codes, dtype=np.uint8))
+
+    def image(self, codes):
+        # grid [x, y] with y = 0 at the bottom, as in CanvasGrid, to image rows
+        rgb = self.palette[codes.T[::-1]]
+        rgb = rgb.repeat(self.scale, axis=0).repeat(self.scale, axis=1)
+        padding = ((0, self.size[1] - rgb.shape[0]), (0, self.size[0] - rgb.shape[1]), (0, 0))
+        return np.pad(rgb, padding, mode="edge")
+
+    def encode(self):
+        try:
+            while True:
+                codes = self.frames.get()
+                if codes is None:
+                    break
+                self.process.stdin.write(self.image(codes).tobytes())
+        except Exception as error:
+            self.error = error
+            # keep emptying the queue so write() and close() do not hang
+            while self.frames.get() is not None:
+                pass
+
+    def close(self):
+        """Wait until every frame is encoded and the video file is finished."""
+        if self.process is None:
+            return
+        self.frames.put(None)
+        self.thread.join()
+        self.process.stdin.close()
+        self.process.wait()
+        self.process = None
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def render_run(model, frame, writer, steps, every=1):
+    """Run model for at most steps ticks and write every every-th tick to writer."""
+    with writer:
+        writer.write(frame(model))
+        for step in range(1, steps + 1):
+            if not model.running:
+                break
+            model.step()
+            if step % every == 0:
+                writer.write(frame(model))
@@ -0,0 +1,149 @@
+"""Parallel, resumable parameter sweeps for Mesa models.
+
+A replacement for mesa.batchrunner.batch_run that writes every finished run
+to a JSON-lines file straight away. Runs already in the file are skipped, so
+a sweep that crashed or was stopped picks up where it left off when it is
+started again with the same arguments.
+
+    run_sweep(Schelling, params, "sweep.jsonl", iterations=5, max_steps=50)
+    results_df = load_results("sweep.jsonl")
+
+The model class has to accept a seed keyword, like Mesa's Model, and needs a
+datacollector with model reporters and a schedule with a steps counter.
+
+Worker processes get the model class by its module and name, so running in
+parallel needs a class defined at module level in an importable .py file. A
+class defined in a notebook only reaches the workers with the fork start
+method (Linux); pass processes=1 for those, as the assignment notebooks do.
+"""
+import functools
+import itertools
+import json
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def parameter_grid(params, iterations=1, master_seed=0):
+    """All combinations of params, each run iterations times.
+
+    Values in params are single values or lists of values, as for batch_run.
+    Iteration i gets the same seed in every combination, derived from
+    master_seed with numpy's SeedSequence, so combinations are compared on
+    the same randomness and every run can be reproduced.
+    """
+    names = list(params)
+    values = [value if isinstance(value, (list, tuple, range)) else [value]
+              for value in params.values()]
+    children = np.random.SeedSequence(master_seed).spawn(iterations)
+    seeds = [int(child.generate_state(1, dtype=np.uint32)[0]) for child in children]
+
+    runs = []
+    for combination in itertools.product(*values):
+        for iteration, seed in enumerate(seeds):
+            runs.append({"params": dict(zip(names, combination)),
+                         "iteration": iteration, "seed": seed})
+    return runs
+
+
+def run_key(params, seed):
+    return json.dumps([params, seed], sort_keys=True, default=_to_json)
+
+
+def run_model(model_cls, run, max_steps=1000):
+    """Run one model until model.running turns False or max_steps is reached.
+
+    Returns the parameters, iteration, seed, the number of steps and the last
+    value of every model reporter.
+    """
+    model = model_cls(**run["params"], seed=run["seed"])
+    while model.running and model.schedule.steps < max_steps:
+        model.step()
+
+    result = dict(run["params"])
+    result["iteration"] = run["iteration"]
+    result["seed"] = run["seed"]
+    result["Step"] = model.schedule.steps
+    for name, values in model.datacollector.model_vars.items():
+        result[name] = values[-1] if values else None
+    return result
+
+
+def completed_runs(path, names):
+    """Keys of the runs already written to path."""
+    keys = set()
+    if not os.path.exists(path):
+        return keys
+    with open(path) as file:
+        for line in file:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                # Half-written last line of a run that crashed
+                continue
+            keys.add(run_key({name: row[name] for name in names}, row["seed"]))
+    return keys
+
+
+def run_sweep(model_cls, params, path, iterations=1, max_steps=1000, processes=None,
+              master_seed=0, chunksize=1):
+    """Run the parameter grid over a process pool, appending each result to path.
+
+    Runs whose (params, seed) are already in path are skipped. With
+    processes=1 everything runs in this process, which also works for model
+    classes that cannot be sent to a worker process, such as classes defined
+    in a notebook. Returns the number of
+    runs done in this call.
+    """
+    runs = parameter_grid(params, iterations, master_seed)
+    done = completed_runs(path, list(params))
+    runs = [run for run in runs if run_key(run["params"], run["seed"]) not in done]
+    if not runs:
+        return 0
+
+    worker = functools.partial(run_model, model_cls, max_steps=max_steps)
+    with open(path, "a") as file:
+        if _ends_mid_line(path):
+            # Start on a new line after a half-written line from a crash
+            file.write("\n")
+        if processes == 1:
+            results = map(worker, runs)
+            _write_results(file, results)
+        else:
+            with multiprocessing.Pool(processes) as pool:
+                _write_results(file, pool.imap_unordered(worker, runs, chunksize=chunksize))
+    return len(runs)
+
+
+def _ends_mid_line(path):
+    if os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) != b"\n"
+
+
+def _write_results(file, results):
+    for result in results:
+        file.write(json.dumps(result, default=_to_json) + "\n")
+        file.flush()
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def load_results(path):
+    """All finished runs in path as one DataFrame."""
+    rows = []
+    with open(path) as file:
+        for line in file:
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return pd.DataFrame(rows)